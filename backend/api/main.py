@@ -2,6 +2,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import resume, matching, jobs
+from api.services.executors import shutdown_executors
 
 # Create app
 app = FastAPI(
@@ -32,6 +33,10 @@ app.include_router(resume.router)
 app.include_router(matching.router)
 app.include_router(jobs.router)
 
+@app.on_event("shutdown")
+def stop_executors():
+    shutdown_executors()
+
 @app.get("/")
 async def root():
     return {
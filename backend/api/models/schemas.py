@@ -4,14 +4,28 @@ from typing import List, Optional
 
 # ============= REQUEST MODELS =============
 
+class ScoringWeights(BaseModel):
+    """Optional per-request scoring weights (omitted fields keep their defaults; rescaled to sum to 1)"""
+    skill_match: Optional[float] = Field(default=None, ge=0)  # Default 0.40
+    semantic_similarity: Optional[float] = Field(default=None, ge=0)  # Default 0.25
+    experience: Optional[float] = Field(default=None, ge=0)  # Default 0.20
+    title_similarity: Optional[float] = Field(default=None, ge=0)  # Default 0.10
+    skill_depth: Optional[float] = Field(default=None, ge=0)  # Default 0.05
+
 class JobMatchRequest(BaseModel):
     """Request for matching resume to jobs"""
-    resume_data: dict  # Parsed resume from frontend or parse endpoint
+    resume_data: Optional[dict] = None  # Parsed resume from frontend or parse endpoint
+    resume_id: Optional[str] = None  # Session ID from /api/parse-resume (skips re-sending resume_data)
     job_ids: Optional[List[str]] = None  # Optional: specific job IDs to match
+    top_k: Optional[int] = Field(default=None, ge=1)  # Optional: return only the best K jobs
+    min_score: Optional[float] = Field(default=None, ge=0, le=100)  # Optional: minimum matchScore (%)
+    num_candidates: Optional[int] = Field(default=None, ge=0)  # Optional: stage-one shortlist size with top_k (0 = score every job)
+    weights: Optional[ScoringWeights] = None  # Optional: re-rank with custom component weights
 
 class RoadmapRequest(BaseModel):
     """Request for generating learning roadmap"""
-    resume_data: dict
+    resume_data: Optional[dict] = None
+    resume_id: Optional[str] = None
     selected_job: dict
 
 class JobSearchRequest(BaseModel):
@@ -53,6 +67,7 @@ class ParsedResumeResponse(BaseModel):
     experience: List[WorkExperienceResponse] = []
     education: List[EducationResponse] = []
     projects: List[ProjectResponse] = []
+    resume_id: Optional[str] = None  # Send back instead of the full resume on later calls
 
 class JobResponse(BaseModel):
     """Single job with match details - matches frontend mockData structure"""
@@ -73,6 +88,7 @@ class MatchJobsResponse(BaseModel):
     """Response from job matching"""
     jobs: List[JobResponse]
     total_matched: int
+    resume_id: Optional[str] = None
 
 class SkillPlanResponse(BaseModel):
     """Individual skill in roadmap"""
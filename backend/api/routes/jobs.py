@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from api.services.jsearch_service import JSearchService
 from api.services.core_service import core_service
+from api.services.executors import run_blocking
 import sys
 import os
 
@@ -13,7 +14,7 @@ sys.path.insert(0, project_root)
 
 from job_ingestion.database import SessionLocal
 from job_ingestion.storage.models import Job as JobModel
-from jd_parser.jd_parser import HybridJDParser
+from jd_parser.jd_parser import HybridJDParser, PARSER_VERSION
 
 router = APIRouter(prefix="/api", tags=["Jobs"])
 
@@ -29,6 +30,7 @@ class JobSearchRequest(BaseModel):
     date_posted: str = "week"
     page: int = 1
     resume_data: Optional[dict] = None  # Optional: for immediate matching
+    resume_id: Optional[str] = None  # Optional: session ID from /api/parse-resume
 
 class JobSearchResponse(BaseModel):
     jobs: List[dict]
@@ -36,6 +38,64 @@ class JobSearchResponse(BaseModel):
     page: int
     matched: bool = False  # True if matching was performed
 
+def store_jobs(jobs_data: List[dict]) -> int:
+    """
+    Store new JSearch jobs in the database, parsing each description once
+    
+    Args:
+        jobs_data: Normalized jobs from JSearchService
+        
+    Returns:
+        Number of newly stored jobs
+    """
+    db = SessionLocal()
+    stored_count = 0
+    
+    try:
+        for job_data in jobs_data:
+            # Check if job already exists
+            existing = db.query(JobModel).filter(
+                JobModel.job_id == job_data['job_id']
+            ).first()
+            
+            if not existing:
+                # Parse job description to extract skills
+                try:
+                    parsed_job = jd_parser.parse(job_data['description_text'])
+                    # Store parsed skills as comma-separated tags
+                    tags = ','.join(parsed_job.technical_skills) if parsed_job.technical_skills else None
+                except Exception as e:
+                    print(f"Error parsing job {job_data['job_id']}: {e}")
+                    parsed_job = None
+                    tags = None
+                
+                # Create new job entry
+                new_job = JobModel(
+                    job_id=job_data['job_id'],
+                    title=job_data['title'],
+                    company=job_data['company'],
+                    location=job_data['location'],
+                    description_text=job_data['description_text'],
+                    description_html=job_data['description_html'],
+                    url=job_data['url'],
+                    source=job_data['source'],
+                    salary=job_data.get('salary'),
+                    job_type=job_data.get('job_type'),
+                    tags=tags
+                )
+                if parsed_job is not None:
+                    new_job.set_parsed_fields(parsed_job, PARSER_VERSION)
+                db.add(new_job)
+                stored_count += 1
+        
+        db.commit()
+        print(f"Stored {stored_count} new jobs in database")
+        
+    finally:
+        db.close()
+    
+    return stored_count
+
 @router.post("/search-jobs", response_model=JobSearchResponse)
 async def search_jobs(request: JobSearchRequest):
     """
@@ -51,7 +111,8 @@ async def search_jobs(request: JobSearchRequest):
     try:
         # Step 1: Search jobs via JSearch API
         print(f"Searching for: {request.query} in {request.location}")
-        jobs_data = jsearch_service.search_jobs(
+        jobs_data = await run_blocking(
+            jsearch_service.search_jobs,
             query=request.query,
             country=request.location,
             remote_only=request.remote_only,
@@ -68,49 +129,8 @@ async def search_jobs(request: JobSearchRequest):
                 matched=False
             )
         
-        # Step 2: Store jobs in database
-        db = SessionLocal()
-        stored_count = 0
-        
-        try:
-            for job_data in jobs_data:
-                # Check if job already exists
-                existing = db.query(JobModel).filter(
-                    JobModel.job_id == job_data['job_id']
-                ).first()
-                
-                if not existing:
-                    # Parse job description to extract skills
-                    try:
-                        parsed_job = jd_parser.parse(job_data['description_text'])
-                        # Store parsed skills as comma-separated tags
-                        tags = ','.join(parsed_job.technical_skills) if parsed_job.technical_skills else None
-                    except Exception as e:
-                        print(f"Error parsing job {job_data['job_id']}: {e}")
-                        tags = None
-                    
-                    # Create new job entry
-                    new_job = JobModel(
-                        job_id=job_data['job_id'],
-                        title=job_data['title'],
-                        company=job_data['company'],
-                        location=job_data['location'],
-                        description_text=job_data['description_text'],
-                        description_html=job_data['description_html'],
-                        url=job_data['url'],
-                        source=job_data['source'],
-                        salary=job_data.get('salary'),
-                        job_type=job_data.get('job_type'),
-                        tags=tags
-                    )
-                    db.add(new_job)
-                    stored_count += 1
-            
-            db.commit()
-            print(f"Stored {stored_count} new jobs in database")
-            
-        finally:
-            db.close()
+        # Step 2: Store jobs in database (DB writes + JD parsing block, so run them off the event loop)
+        await run_blocking(store_jobs, jobs_data)
         
         # Step 3: Format response
         response_jobs = []
@@ -129,25 +149,33 @@ async def search_jobs(request: JobSearchRequest):
         
         # Step 4: (Optional) Match against resume if provided
         matched = False
-        if request.resume_data:
+        if request.resume_data or request.resume_id:
             # Load jobs from cache and match
             try:
-                # Reload jobs into core service cache
-                core_service._load_sample_jobs()
+                # Pull only the jobs stored since the last refresh into the core service cache
+                await run_blocking(core_service.refresh_jobs)
+                
+                # Response jobs use external IDs; the cache is keyed by DB row
+                job_keys = core_service.job_keys_for([job['id'] for job in response_jobs])
+                resp_jobs_by_key = {
+                    job_keys[job['id']]: job for job in response_jobs if job['id'] in job_keys
+                }
                 
                 # Perform matching
-                matched_jobs = core_service.match_resume_to_jobs(
+                matched_jobs = await run_blocking(
+                    core_service.match_resume_to_jobs,
                     request.resume_data,
-                    specific_job_ids=[job['id'] for job in response_jobs]
-                )
+                    specific_job_ids=list(resp_jobs_by_key),
+                    resume_id=request.resume_id
+                ) if resp_jobs_by_key else []
                 
                 # Update response with match scores
                 for matched_job in matched_jobs:
-                    for resp_job in response_jobs:
-                        if resp_job['id'] == matched_job['id']:
-                            resp_job['matchScore'] = matched_job.get('matchScore', 0)
-                            resp_job['skills'] = matched_job.get('skills', [])
-                            resp_job['missingSkills'] = matched_job.get('missingSkills', [])
+                    resp_job = resp_jobs_by_key.get(matched_job['id'])
+                    if resp_job is not None:
+                        resp_job['matchScore'] = matched_job.get('matchScore', 0)
+                        resp_job['skills'] = matched_job.get('skills', [])
+                        resp_job['missingSkills'] = matched_job.get('missingSkills', [])
                 
                 matched = True
             except Exception as e:
@@ -11,8 +11,12 @@ from api.models.schemas import (
     JobSearchResponse
 )
 from api.services.core_service import core_service
+from api.services.resume_sessions import ResumeSessionNotFound
+from api.services.executors import run_blocking
 from typing import Optional
 
+RESUME_SESSION_EXPIRED = "Resume session not found or expired; send resume_data or re-upload the resume"
+
 router = APIRouter(prefix="/api", tags=["Matching"])
 
 @router.post("/match-jobs", response_model=MatchJobsResponse)
@@ -20,22 +24,34 @@ async def match_jobs(request: JobMatchRequest):
     """
     POST /api/match-jobs
     
-    Input: Parsed Resume data + optional Job IDs
+    Input: Parsed Resume data or resume_id + optional Job IDs
     Process: Calls weighted_scorer.py
     Returns: List of Jobs with matchScore and missingSkills
     """
     try:
-        # Match resume to jobs
-        matched_jobs = core_service.match_resume_to_jobs(
-            request.resume_data,
-            request.job_ids
+        session = await run_blocking(core_service.get_resume_session, request.resume_data, request.resume_id)
+        
+        # Match resume to jobs (embedding + scoring run off the event loop)
+        matched_jobs = await run_blocking(
+            core_service.match_resume_to_jobs,
+            specific_job_ids=request.job_ids,
+            top_k=request.top_k,
+            min_score=request.min_score,
+            num_candidates=request.num_candidates,
+            weights=request.weights.model_dump(exclude_none=True) if request.weights else None,
+            session=session
         )
         
         return MatchJobsResponse(
             jobs=matched_jobs,
-            total_matched=len(matched_jobs)
+            total_matched=len(matched_jobs),
+            resume_id=session.resume_id
         )
         
+    except ResumeSessionNotFound:
+        raise HTTPException(status_code=404, detail=RESUME_SESSION_EXPIRED)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -52,13 +68,17 @@ async def generate_roadmap(request: RoadmapRequest):
     Returns: Phased roadmap structure matching frontend
     """
     try:
-        roadmap = core_service.generate_roadmap(
+        roadmap = await run_blocking(
+            core_service.generate_roadmap,
             request.resume_data,
-            request.selected_job
+            request.selected_job,
+            resume_id=request.resume_id
         )
         
         return RoadmapResponse(**roadmap)
         
+    except ResumeSessionNotFound:
+        raise HTTPException(status_code=404, detail=RESUME_SESSION_EXPIRED)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -67,9 +87,10 @@ async def generate_roadmap(request: RoadmapRequest):
 
 @router.post("/explain-match", response_model=ExplanationResponse)
 async def explain_match(
-    resume_data: dict = Body(...),
     job: dict = Body(...),
-    match_score: float = Body(...)
+    match_score: float = Body(...),
+    resume_data: Optional[dict] = Body(None),
+    resume_id: Optional[str] = Body(None)
 ):
     """
     POST /api/explain-match
@@ -77,14 +98,18 @@ async def explain_match(
     Generate AI explanation for why resume matches job
     """
     try:
-        explanation = core_service.generate_explanation(
+        explanation = await run_blocking(
+            core_service.generate_explanation,
             resume_data,
             job,
-            match_score
+            match_score,
+            resume_id=resume_id
         )
         
         return ExplanationResponse(**explanation)
         
+    except ResumeSessionNotFound:
+        raise HTTPException(status_code=404, detail=RESUME_SESSION_EXPIRED)
     except Exception as e:
         raise HTTPException(
             status_code=500,
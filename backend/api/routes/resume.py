@@ -2,6 +2,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from api.models.schemas import ParsedResumeResponse
 from api.services.core_service import core_service
+from api.services.executors import run_blocking
 
 router = APIRouter(prefix="/api", tags=["Resume"])
 
@@ -12,7 +13,7 @@ async def parse_resume(file: UploadFile = File(...)):
     
     Upload and parse resume (PDF/DOCX)
     
-    Returns: Parsed resume matching Resume model
+    Returns: Parsed resume matching Resume model, plus a resume_id for follow-up calls
     """
     # Validate file type
     if not file.filename.endswith(('.pdf', '.docx', '.doc')):
@@ -28,7 +29,10 @@ async def parse_resume(file: UploadFile = File(...)):
         # Convert to dict for response
         resume_dict = core_service.convert_resume_to_dict(parsed_resume)
         
-        return ParsedResumeResponse(**resume_dict)
+        # Keep the parsed resume server-side so later calls can send just the resume_id
+        session = await run_blocking(core_service.create_resume_session, parsed_resume, resume_dict)
+        
+        return ParsedResumeResponse(**resume_dict, resume_id=session.resume_id)
         
     except Exception as e:
         raise HTTPException(
@@ -12,15 +12,26 @@ from rag.weighted_scorer import WeightedScorer
 from rag.roadmap_generator import LearningRoadmapGenerator
 from rag.rag_explainer import RAGExplainer
 from embeddings.embedding_model import get_embedding_model
+from embeddings.job_catalog import JobCatalog
 from resume_parser.models import Resume
-from jd_parser.jd_parser import JobDescription
+from jd_parser.jd_parser import JobDescription, PARSER_VERSION
 from api.services.job_search_service import JobSearchService
 from api.services.job_search_service import JobSearchService
-from job_ingestion.database import get_db, SessionLocal
+from api.services.resume_sessions import ResumeSession, ResumeSessionStore, ResumeSessionNotFound
+from api.services.executors import run_blocking, run_cpu_bound
+from utils.document_text import extract_upload_text
+from job_ingestion.database import get_db, SessionLocal, init_db
 from job_ingestion.storage.models import Job as JobModel
-import uuid
+from sqlalchemy import or_
+from sqlalchemy.orm import defer
+import threading
 import tempfile
-from typing import List, Dict
+import time
+import hashlib
+import json
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Optional
 
 class CoreService:
     """Bridge service connecting FastAPI to existing Python logic"""
@@ -36,11 +47,35 @@ class CoreService:
         self.job_search_service = JobSearchService()
         
         # In-memory cache (use Redis in production)
-        self.resume_cache = {}
-        self.job_cache = {}
+        # resume_id -> parsed Resume + embedding + scoring profile (LRU with TTL)
+        self.resume_cache = ResumeSessionStore()
+        # job_id -> JobDescription, with a normalized embedding matrix kept in sync
+        self.job_cache = JobCatalog(self.embedding_model)
+        # (resume_id, catalog version, job set) -> component score arrays, so
+        # re-weighting a match is one weighted sum instead of a re-match.
+        # LRU bounded by entry count and bytes; entries for an older catalog
+        # version can never hit again and are dropped once the version moves on
+        self._score_cache = OrderedDict()  # key -> (scores, nbytes), least recent first
+        self._score_cache_size = int(os.getenv("SCORE_CACHE_SIZE", "64"))
+        self._score_cache_max_bytes = int(float(os.getenv("SCORE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        self._score_cache_bytes = 0
+        self._score_cache_version = 0
+        self._score_cache_lock = threading.Lock()
         
-        # Load sample jobs from data folder
+        # High-water marks for incremental DB refresh (see refresh_jobs)
+        self._db_max_id = 0
+        self._db_max_updated_at = None
+        self._db_rows = {}  # Job.id -> (external Job.job_id, updated_at as last read)
+        self._db_job_keys = {}  # external Job.job_id -> job_cache key
+        self._refresh_lock = threading.Lock()
+        
+        # Load sample jobs from data folder, then everything in the jobs table
         self._load_sample_jobs()
+        try:
+            init_db()
+        except Exception as e:
+            print(f"Database init failed: {e}")
+        self.refresh_jobs()
     
     def _load_sample_jobs(self):
         """Load sample jobs from data folder or create default ones"""
@@ -73,45 +108,120 @@ class CoreService:
             """
         ]
         
-        for job_text in sample_jobs:
+        for i, job_text in enumerate(sample_jobs):
             try:
-                job_id = str(uuid.uuid4())
                 parsed_job = self.jd_parser.parse(job_text)
-                self.job_cache[job_id] = parsed_job
+                self.job_cache[f"sample_{i}"] = parsed_job
             except:
                 pass
-
-        # Load from Database (Job Ingestion)
-        try:
-            db = SessionLocal()
-            db_jobs = db.query(JobModel).all()
-            for db_job in db_jobs:
+    
+    def refresh_jobs(self) -> int:
+        """
+        Pull jobs added, updated or deleted in the DB since the last refresh into job_cache
+        
+        Only rows past the stored high-water mark (Job.id / Job.updated_at) are
+        read, parsed (if stale) and embedded, so the cost scales with the delta.
+        The mark is taken from updated_at as read, and re-parse writes keep
+        updated_at unchanged, so this process's own writes never move it past
+        a concurrent update. Rows are keyed as "db_<Job.id>", so refreshing
+        never duplicates a job; rows deleted from the DB are dropped from the cache.
+        
+        Returns:
+            Number of jobs inserted, updated or removed in the cache
+        """
+        with self._refresh_lock:
+            try:
+                db = SessionLocal()
                 try:
-                    # Convert DB model to JobDescription object expected by the system
-                    # We might need to split tags to skills if available, or just rely on description parsing
-                    # Ideally, we should parse the description to get actual skills using the JDParser
-                    # But for performance, we can do it on demand or pre-parse.
-                    # For now, let's parse the description text to ensure skills are extracted.
+                    # Single bulk query. Parsed fields are stored on each row at ingestion,
+                    # so raw descriptions are only fetched for rows that need re-parsing.
+                    query = db.query(JobModel).options(
+                        defer(JobModel.description_text),
+                        defer(JobModel.description_html)
+                    )
+                    if self._db_max_updated_at is not None:
+                        # >= so a row updated within the same timestamp as the
+                        # mark is not missed; rows already seen are skipped below
+                        query = query.filter(or_(
+                            JobModel.id > self._db_max_id,
+                            JobModel.updated_at >= self._db_max_updated_at
+                        ))
+                    db_jobs = [
+                        db_job for db_job in query.order_by(JobModel.id).all()
+                        if self._db_rows.get(db_job.id) != (db_job.job_id, db_job.updated_at)
+                    ]
                     
-                    # Using existing parser to extract skills/metadata from raw text
-                    parsed_job = self.jd_parser.parse(db_job.description_text or db_job.description_html)
+                    # Advance the high-water mark from the values as read
+                    for db_job in db_jobs:
+                        self._db_max_id = max(self._db_max_id, db_job.id)
+                        if db_job.updated_at is not None and (
+                            self._db_max_updated_at is None or db_job.updated_at > self._db_max_updated_at
+                        ):
+                            self._db_max_updated_at = db_job.updated_at
                     
-                    # Override fields with known DB data
-                    parsed_job.job_title = db_job.title
-                    parsed_job.company = db_job.company
-                    parsed_job.location = db_job.location
-                    # parsed_job.experience_required is extracted by parser
+                    reparsed = 0
+                    for db_job in db_jobs:
+                        try:
+                            if db_job.parser_version != PARSER_VERSION:
+                                # Never parsed, or parsed by an older parser version
+                                parsed_job = self.jd_parser.parse(db_job.description_text or db_job.description_html)
+                                db_job.store_parsed_fields(db, parsed_job, PARSER_VERSION)
+                                reparsed += 1
+                            
+                            # Use a prefix to avoid collision with the sample job keys
+                            job_key = f"db_{db_job.id}"
+                            self.job_cache[job_key] = self._job_from_row(db_job)
+                            previous = self._db_rows.get(db_job.id)
+                            if previous is not None and previous[0] != db_job.job_id:
+                                self._db_job_keys.pop(previous[0], None)
+                            self._db_rows[db_job.id] = (db_job.job_id, db_job.updated_at)
+                            self._db_job_keys[db_job.job_id] = job_key
+                        except Exception as ex:
+                            print(f"Failed to load DB job {db_job.id}: {ex}")
                     
-                    # Store in cache
-                    # Use a prefix/suffix to avoid collision with UUIDs if needed, or just string of ID
-                    job_uuid = f"db_{db_job.id}" 
-                    self.job_cache[job_uuid] = parsed_job
-                except Exception as ex:
-                    print(f"Failed to load DB job {db_job.id}: {ex}")
-            db.close()
-            print(f"Loaded {len(db_jobs)} jobs from database.")
-        except Exception as e:
-            print(f"Database loading failed: {e}")
+                    if reparsed:
+                        db.commit()
+                    
+                    # Drop jobs whose rows were deleted (an ID-only scan)
+                    live_ids = {row_id for (row_id,) in db.query(JobModel.id)}
+                    deleted = [row_id for row_id in self._db_rows if row_id not in live_ids]
+                    for row_id in deleted:
+                        external_id, _ = self._db_rows.pop(row_id)
+                        if self._db_job_keys.get(external_id) == f"db_{row_id}":
+                            del self._db_job_keys[external_id]
+                    removed = self.job_cache.remove_many(f"db_{row_id}" for row_id in deleted)
+                finally:
+                    db.close()
+                print(
+                    f"Loaded {len(db_jobs)} new/updated jobs from database "
+                    f"({reparsed} re-parsed, {removed} removed)."
+                )
+                return len(db_jobs) + removed
+            except Exception as e:
+                print(f"Database loading failed: {e}")
+                return 0
+    
+    def job_keys_for(self, external_job_ids: List[str]) -> Dict[str, str]:
+        """Map external Job.job_id values to their job_cache keys (unknown IDs are skipped)"""
+        return {
+            job_id: self._db_job_keys[job_id]
+            for job_id in external_job_ids
+            if job_id in self._db_job_keys
+        }
+    
+    def _job_from_row(self, db_job: JobModel) -> JobDescription:
+        """Build a JobDescription from the parsed fields stored on a Job row"""
+        return JobDescription(
+            job_title=db_job.title or db_job.parsed_title,
+            company=db_job.company,
+            location=db_job.location,
+            experience_required=db_job.experience_required or "Not specified",
+            experience_min_years=db_job.experience_min_years,
+            experience_max_years=db_job.experience_max_years,
+            technical_skills=db_job.parsed_skills(),
+            job_type=db_job.job_type,
+            salary_range=db_job.salary
+        )
     
     async def parse_resume_file(self, file) -> Resume:
         """
@@ -125,8 +235,10 @@ class CoreService:
         """
         content = await file.read()
         
-        # Parse using the updated parser method
-        parsed = self.resume_parser.parse_upload(content, file.filename)
+        # PDF/DOCX extraction is pure-Python CPU work -> process pool;
+        # the LLM call blocks on network -> thread pool
+        text = await run_cpu_bound(extract_upload_text, content, file.filename)
+        parsed = await run_blocking(self.resume_parser.parse, text)
         
         return parsed
     
@@ -197,38 +309,117 @@ class CoreService:
             ]
         )
     
-    def match_resume_to_jobs(self, resume_data: dict, specific_job_ids: List[str] = None) -> List[dict]:
+    def _resume_id_for(self, resume_dict: dict) -> str:
+        """Content-addressed session key for a resume dict (the resume_id field itself is ignored)"""
+        payload = {k: v for k, v in resume_dict.items() if k != 'resume_id'}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:32]
+    
+    def create_resume_session(self, resume: Resume, resume_dict: dict = None) -> ResumeSession:
+        """
+        Cache a parsed resume with its embedding and scoring profile
+        
+        Args:
+            resume: Parsed Resume object
+            resume_dict: Its dict form (defaults to convert_resume_to_dict(resume))
+            
+        Returns:
+            ResumeSession (resume_id is what clients send back)
+        """
+        if resume_dict is None:
+            resume_dict = self.convert_resume_to_dict(resume)
+        resume_id = self._resume_id_for(resume_dict)
+        
+        session = self.resume_cache.get(resume_id)
+        if session is not None:
+            return session
+        
+        session = ResumeSession(
+            resume_id,
+            resume,
+            self.embedding_model.encode_resume(resume),
+            self.scorer.build_resume_profile(resume),
+            payload_bytes=len(json.dumps(resume_dict, default=str))
+        )
+        self.resume_cache.put(session)
+        return session
+    
+    def get_resume_session(self, resume_data: dict = None, resume_id: str = None) -> ResumeSession:
+        """
+        Resolve the resume for a request
+        
+        Uses the cached session for resume_id when it is still alive; otherwise
+        falls back to resume_data (which is validated and encoded once, then cached).
+        
+        Raises:
+            ResumeSessionNotFound: resume_id unknown/expired and no resume_data sent
+        """
+        if resume_id:
+            session = self.resume_cache.get(resume_id)
+            if session is not None:
+                return session
+        
+        if not resume_data:
+            raise ResumeSessionNotFound(resume_id)
+        
+        session = self.resume_cache.get(self._resume_id_for(resume_data))
+        if session is not None:
+            return session
+        
+        return self.create_resume_session(self.dict_to_resume(resume_data), resume_data)
+    
+    def match_resume_to_jobs(self, resume_data: dict = None, specific_job_ids: List[str] = None,
+                             top_k: Optional[int] = None, min_score: Optional[float] = None,
+                             resume_id: Optional[str] = None, num_candidates: Optional[int] = None,
+                             weights: Optional[Dict[str, float]] = None,
+                             session: Optional[ResumeSession] = None) -> List[dict]:
         """
         Match resume to all jobs or specific jobs
         
+        By default every job is scored, so top_k results are exact. Two-stage
+        matching is opt-in (num_candidates / MATCH_CANDIDATES > 0, with top_k
+        set and no specific_job_ids): JobCatalog.candidates shortlists jobs by
+        embedding similarity and shared skills, then the full WeightedScorer
+        ranks only that shortlist. That is faster on large catalogs but
+        approximate - a job outside both shortlists is never returned. Measure
+        recall on the live catalog with backend/evaluate_candidate_recall.py
+        before enabling it.
+        Component scores are cached per (resume, catalog version, job set), so
+        repeating a match with different weights only re-ranks.
+        
         Args:
-            resume_data: Parsed resume dict
+            resume_data: Parsed resume dict (optional when resume_id is given)
             specific_job_ids: Optional list of job IDs to match against
+            top_k: Optional number of best jobs to return (detailed breakdowns
+                are built only for those)
+            min_score: Optional minimum matchScore (0-100) a job needs to be returned
+            resume_id: Optional session ID from /api/parse-resume
+            num_candidates: Stage-one shortlist size (default: MATCH_CANDIDATES
+                or 0 = score every job)
+            weights: Optional scoring weight overrides, e.g. {'experience': 0.4}
+                (see WeightedScorer.resolve_weights)
+            session: Already resolved ResumeSession (skips the cache lookup, so
+                an eviction after the caller resolved it cannot fail the match)
             
         Returns:
-            List of jobs with match scores (frontend format)
+            List of jobs with match scores (frontend format), best first
+            
+        Raises:
+            ValueError: invalid weights
         """
-        # Convert dict to Resume object
-        resume = self.dict_to_resume(resume_data)
+        # Cached Resume object, embedding and scoring profile
+        if session is None:
+            session = self.get_resume_session(resume_data, resume_id)
+        weights = self.scorer.resolve_weights(weights)
         
-        # Get jobs to match against
-        jobs_to_match = {}
-        if specific_job_ids:
-            jobs_to_match = {jid: job for jid, job in self.job_cache.items() if jid in specific_job_ids}
-        else:
-            jobs_to_match = self.job_cache
+        if num_candidates is None:
+            num_candidates = int(os.getenv("MATCH_CANDIDATES", "0"))
+        
+        scores = self._component_scores(session, specific_job_ids, top_k, num_candidates)
+        ranked = self._rank(session, scores, top_k, min_score, weights)
         
         matched_jobs = []
         
-        for job_id, job in jobs_to_match.items():
-            # Calculate semantic similarity
-            resume_embedding = self.embedding_model.encode_resume(resume)
-            job_embedding = self.embedding_model.encode_job(job)
-            semantic_score = self.embedding_model.compute_similarity(resume_embedding, job_embedding)
-            
-            # Get weighted score
-            scoring_result = self.scorer.calculate_weighted_score(resume, job, semantic_score)
-            
+        for job_id, job, scoring_result in ranked:
             # Extract skill details
             skill_details = scoring_result['breakdown']['skill_match']['details']
             
@@ -248,23 +439,163 @@ class CoreService:
                 'experience_required': job.experience_required
             })
         
-        # Sort by match score
-        matched_jobs.sort(key=lambda x: x['matchScore'], reverse=True)
-        
         return matched_jobs
     
-    def generate_roadmap(self, resume_data: dict, selected_job: dict) -> dict:
+    def _component_scores(self, session: ResumeSession, specific_job_ids: Optional[List[str]],
+                          top_k: Optional[int], num_candidates: int, use_cache: bool = True) -> Dict:
+        """
+        WeightedScorer.calculate_weighted_scores arrays for the jobs this match covers:
+        the two-stage shortlist when top_k and num_candidates are set (and no
+        specific_job_ids), else every job (or every job in specific_job_ids)
+        """
+        version = self.job_cache.version
+        two_stage = bool(top_k and num_candidates and not specific_job_ids)
+        if two_stage:
+            job_set = ('candidates', max(num_candidates, top_k))
+        else:
+            job_set = ('jobs', tuple(sorted(specific_job_ids)) if specific_job_ids else None)
+        key = (session.resume_id, version, job_set)
+        
+        if use_cache:
+            with self._score_cache_lock:
+                entry = self._score_cache.get(key)
+                if entry is not None:
+                    self._score_cache.move_to_end(key)
+                    return entry[0]
+        
+        # One catalog snapshot per pass: candidates, semantic scores and every
+        # component read the same jobs even if refresh_jobs runs meanwhile
+        if two_stage:
+            # Stage one: shortlist by embedding similarity + shared skills
+            snapshot, semantic_scores = self.job_cache.candidates(
+                session.embedding, session.profile['canonical_skills'], job_set[1]
+            )
+        else:
+            job_ids = None
+            if specific_job_ids:
+                wanted = set(specific_job_ids)
+                job_ids = [jid for jid in self.job_cache.keys() if jid in wanted]
+            snapshot = self.job_cache.snapshot(job_ids)
+            # Score the (already encoded) resume against every job embedding at once
+            semantic_scores = snapshot.similarities(session.embedding)
+        
+        # Every component for every job as arrays
+        scores = self.scorer.calculate_weighted_scores(
+            session.resume,
+            snapshot,
+            semantic_scores=semantic_scores,
+            profile=session.profile
+        )
+        # Keyed by the version actually scored
+        key = (session.resume_id, snapshot.version, job_set)
+        
+        if use_cache:
+            self._cache_scores(key, scores)
+        return scores
+    
+    def _cache_scores(self, key: tuple, scores: Dict):
+        """Store component scores, dropping stale-version entries, then least recently used ones over budget"""
+        version = key[1]
+        # Arrays own their memory; lists only hold references to catalog objects
+        nbytes = sum(
+            value.nbytes if isinstance(value, np.ndarray) else 8 * len(value)
+            for value in scores.values()
+        )
+        with self._score_cache_lock:
+            if version < self._score_cache_version:
+                return  # Scored against a catalog that has already moved on
+            if version > self._score_cache_version:
+                self._score_cache_version = version
+                for stale_key in [k for k in self._score_cache if k[1] < version]:
+                    self._score_cache_bytes -= self._score_cache.pop(stale_key)[1]
+            
+            previous = self._score_cache.pop(key, None)
+            if previous is not None:
+                self._score_cache_bytes -= previous[1]
+            self._score_cache[key] = (scores, nbytes)
+            self._score_cache_bytes += nbytes
+            while self._score_cache and (
+                len(self._score_cache) > self._score_cache_size
+                or self._score_cache_bytes > self._score_cache_max_bytes
+            ):
+                _, (_, dropped) = self._score_cache.popitem(last=False)
+                self._score_cache_bytes -= dropped
+    
+    def _rank(self, session: ResumeSession, scores: Dict, top_k: Optional[int],
+              min_score: Optional[float], weights: Optional[Dict[str, float]] = None) -> List[tuple]:
+        """Order component scores and build detailed results for the returned rows: [(job_id, job, scoring_result)]"""
+        order = self.scorer.rank_scores(
+            scores,
+            top_k=top_k,
+            min_score=min_score / 100 if min_score is not None else None,
+            weights=weights
+        )
+        job_ids, jobs = scores['job_ids'], scores['jobs']
+        return [
+            (job_ids[index], jobs[index], self.scorer.build_result(
+                session.resume, jobs[index], scores, index, session.profile, weights
+            ))
+            for index in order
+        ]
+    
+    def evaluate_candidate_recall(self, resume_data: dict = None, resume_id: Optional[str] = None,
+                                  top_k: int = 10, candidate_counts: Optional[List[int]] = None) -> dict:
+        """
+        Compare two-stage matching against the exhaustive ranking for one resume
+        (for tuning MATCH_CANDIDATES: recall vs. latency on the live catalog;
+        see backend/evaluate_candidate_recall.py)
+        
+        Args:
+            resume_data: Parsed resume dict (optional when resume_id is given)
+            resume_id: Optional session ID from /api/parse-resume
+            top_k: Ranking depth to compare
+            candidate_counts: Shortlist sizes to try (default: 50, 100, 200, 500, 1000)
+            
+        Returns:
+            Dict with catalog size, exhaustive latency and one row per candidate
+            count: recall@top_k, shortlist size and latency
+        """
+        session = self.get_resume_session(resume_data, resume_id)
+        candidate_counts = candidate_counts or [50, 100, 200, 500, 1000]
+        
+        start = time.perf_counter()
+        scores = self._component_scores(session, None, top_k, 0, use_cache=False)
+        exhaustive = [job_id for job_id, _, _ in self._rank(session, scores, top_k, None)]
+        exhaustive_ms = (time.perf_counter() - start) * 1000
+        
+        rows = []
+        for num_candidates in candidate_counts:
+            start = time.perf_counter()
+            scores = self._component_scores(session, None, top_k, num_candidates, use_cache=False)
+            two_stage = [job_id for job_id, _, _ in self._rank(session, scores, top_k, None)]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            rows.append({
+                'num_candidates': num_candidates,
+                'candidates_scored': len(scores['job_ids']),
+                'recall': len(set(two_stage) & set(exhaustive)) / len(exhaustive) if exhaustive else 1.0,
+                'latency_ms': round(elapsed_ms, 2)
+            })
+        
+        return {
+            'catalog_size': len(self.job_cache),
+            'top_k': top_k,
+            'exhaustive_latency_ms': round(exhaustive_ms, 2),
+            'results': rows
+        }
+    
+    def generate_roadmap(self, resume_data: dict, selected_job: dict, resume_id: Optional[str] = None) -> dict:
         """
         Generate learning roadmap
         
         Args:
-            resume_data: Parsed resume dict
+            resume_data: Parsed resume dict (optional when resume_id is given)
             selected_job: Selected job dict from frontend
+            resume_id: Optional session ID from /api/parse-resume
             
         Returns:
             Roadmap in frontend format
         """
-        resume = self.dict_to_resume(resume_data)
+        resume = self.get_resume_session(resume_data, resume_id).resume
         
         # Get missing skills from selected job
         missing_skills = selected_job.get('missingSkills', [])
@@ -303,9 +634,10 @@ class CoreService:
             'summary': roadmap['summary']
         }
     
-    def generate_explanation(self, resume_data: dict, job: dict, match_score: float) -> dict:
-        """Generate AI explanation for match"""
-        resume = self.dict_to_resume(resume_data)
+    def generate_explanation(self, resume_data: dict, job: dict, match_score: float,
+                             resume_id: Optional[str] = None) -> dict:
+        """Generate AI explanation for match (resume_data optional when resume_id is given)"""
+        resume = self.get_resume_session(resume_data, resume_id).resume
         
         # Get job from cache
         job_obj = self.job_cache.get(job['id'])
@@ -0,0 +1,70 @@
+# backend/api/services/executors.py
+"""
+Execution layer for blocking work called from async route handlers
+
+- run_blocking: bounded thread pool for LLM / HTTP / DB calls and model
+  inference (torch and numpy release the GIL, and these need the models
+  already loaded in this process)
+- run_cpu_bound: process pool for pure-Python CPU work on picklable,
+  module-level functions (e.g. PDF/DOCX text extraction)
+
+Sizes come from SKILLSYNC_IO_WORKERS and SKILLSYNC_CPU_WORKERS.
+Setting SKILLSYNC_CPU_WORKERS=0 runs CPU work in the thread pool instead
+(for platforms without multiprocessing support, e.g. serverless).
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+IO_WORKERS = int(os.getenv("SKILLSYNC_IO_WORKERS", "16"))
+CPU_WORKERS = int(os.getenv("SKILLSYNC_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_io_executor = None
+_cpu_executor = None
+_lock = threading.Lock()
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Shared thread pool (created on first use)"""
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="skillsync-io")
+        return _io_executor
+
+def get_cpu_executor():
+    """Shared process pool (created on first use); the thread pool when disabled"""
+    global _cpu_executor
+    if CPU_WORKERS <= 0:
+        return get_io_executor()
+    with _lock:
+        if _cpu_executor is None:
+            # spawn, not fork: the parent already runs model / executor threads
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _cpu_executor
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call in the thread pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run a CPU-heavy, picklable module-level function in the process pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_executors():
+    """Stop both pools (called on app shutdown)"""
+    global _io_executor, _cpu_executor
+    with _lock:
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=False, cancel_futures=True)
+            _cpu_executor = None
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=False, cancel_futures=True)
+            _io_executor = None
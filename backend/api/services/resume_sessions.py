@@ -0,0 +1,107 @@
+# backend/api/services/resume_sessions.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class ResumeSessionNotFound(KeyError):
+    """Raised when a resume_id is unknown or its session has expired"""
+
+class ResumeSession:
+    """
+    Everything derived from one parsed resume that matching needs
+    Kept server-side so follow-up calls can send just the resume_id.
+    """
+
+    def __init__(self, resume_id: str, resume, embedding, profile: dict, payload_bytes: int = 0):
+        """
+        Args:
+            resume_id: Session key returned to the client
+            resume: Parsed Resume object
+            embedding: Resume embedding vector
+            profile: WeightedScorer.build_resume_profile() output
+                (canonical skills, roles, role-title embeddings)
+            payload_bytes: Approximate size of the serialized resume
+        """
+        self.resume_id = resume_id
+        self.resume = resume
+        self.embedding = embedding
+        self.profile = profile
+        self.nbytes = payload_bytes + embedding.nbytes + profile['role_embeddings'].nbytes
+        self.last_access = time.monotonic()
+
+class ResumeSessionStore:
+    """
+    Bounded LRU of resume sessions with a TTL and memory accounting
+    A session is evicted when it has not been used for ttl_seconds, or when
+    the store exceeds max_sessions / max_bytes (least recently used first).
+    """
+
+    def __init__(self, max_sessions: int = None, ttl_seconds: float = None, max_bytes: int = None):
+        if max_sessions is None:
+            max_sessions = int(os.getenv("RESUME_SESSION_MAX", "1000"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("RESUME_SESSION_TTL_SECONDS", "3600"))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("RESUME_SESSION_MAX_MB", "64")) * 1024 * 1024)
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._sessions = OrderedDict()  # resume_id -> ResumeSession, least recent first
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, resume_id: str) -> Optional[ResumeSession]:
+        """Return a live session and mark it recently used (None if missing/expired)"""
+        with self._lock:
+            session = self._sessions.get(resume_id)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if now - session.last_access > self.ttl_seconds:
+                self._remove(resume_id)
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(resume_id)
+            return session
+
+    def put(self, session: ResumeSession):
+        """Insert or replace a session, evicting expired / least recently used ones"""
+        with self._lock:
+            if session.resume_id in self._sessions:
+                self._remove(session.resume_id)
+            self._sessions[session.resume_id] = session
+            self._bytes += session.nbytes
+            self._evict()
+
+    def __contains__(self, resume_id: str) -> bool:
+        return self.get(resume_id) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by all sessions"""
+        return self._bytes
+
+    def _remove(self, resume_id: str):
+        session = self._sessions.pop(resume_id)
+        self._bytes -= session.nbytes
+
+    def _evict(self):
+        # Expired sessions first (ordered by last access, so they sit at the front)
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access <= self.ttl_seconds:
+                break
+            self._remove(oldest.resume_id)
+
+        # Then least recently used, but never the session just inserted
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._sessions)))
@@ -0,0 +1,52 @@
+# backend/evaluate_candidate_recall.py
+"""
+Measure how often two-stage matching (MATCH_CANDIDATES) returns the same
+top_k jobs as scoring the whole catalog, and what it saves in latency.
+
+Usage (from backend/):
+    python evaluate_candidate_recall.py resume1.json [resume2.json ...] [--top-k 10] [--candidates 50 100 200]
+
+Each file holds a parsed resume as returned by /api/parse-resume.
+"""
+import argparse
+import json
+import os
+import sys
+
+# Run from anywhere: the api package lives next to this file
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api.services.core_service import core_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Two-stage matching recall vs. exhaustive ranking")
+    parser.add_argument("resumes", nargs="+", help="Parsed resume JSON files")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, nargs="+", default=None,
+                        help="Shortlist sizes to try (default: 50 100 200 500 1000)")
+    args = parser.parse_args()
+
+    totals = {}
+    exhaustive_ms = 0.0
+    for path in args.resumes:
+        with open(path, encoding="utf-8") as f:
+            resume_data = json.load(f)
+        report = core_service.evaluate_candidate_recall(
+            resume_data, top_k=args.top_k, candidate_counts=args.candidates
+        )
+        exhaustive_ms += report['exhaustive_latency_ms']
+        for row in report['results']:
+            total = totals.setdefault(row['num_candidates'], {'recall': 0.0, 'latency_ms': 0.0, 'scored': 0})
+            total['recall'] += row['recall']
+            total['latency_ms'] += row['latency_ms']
+            total['scored'] += row['candidates_scored']
+
+    n = len(args.resumes)
+    print(f"Catalog: {len(core_service.job_cache)} jobs, {n} resume(s), top_k={args.top_k}")
+    print(f"Exhaustive: {exhaustive_ms / n:.1f} ms")
+    print(f"{'candidates':>10} {'scored':>8} {'recall':>8} {'ms':>8}")
+    for num_candidates, total in sorted(totals.items()):
+        print(f"{num_candidates:>10} {total['scored'] / n:>8.0f} {total['recall'] / n:>8.3f} {total['latency_ms'] / n:>8.1f}")
+
+if __name__ == "__main__":
+    main()
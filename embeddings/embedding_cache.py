@@ -0,0 +1,189 @@
+# embeddings/embedding_cache.py
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+def default_cache_dir() -> str:
+    """
+    Per-user directory for embedding caches and exported models
+    (EMBEDDING_CACHE_DIR, else $XDG_CACHE_HOME/skill_sync or ~/.cache/skill_sync),
+    so the location does not depend on the working directory.
+    """
+    cache_dir = os.getenv("EMBEDDING_CACHE_DIR")
+    if not cache_dir:
+        cache_dir = os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.join("~", ".cache"), "skill_sync")
+    return os.path.abspath(os.path.expanduser(cache_dir))
+
+class EmbeddingCache:
+    """
+    Content-addressed cache for text embeddings
+    Two tiers: an in-memory LRU and an on-disk SQLite store, so identical
+    text is encoded once per model - across requests and across restarts.
+    Keys are sha256(namespace + text), where the namespace identifies the
+    model (and anything else that changes the vectors).
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _QUERY_CHUNK = 500
+
+    def __init__(self, namespace: str, cache_file: Optional[str] = None, max_memory_items: Optional[int] = None):
+        """
+        Initialize cache
+
+        Args:
+            namespace: Model identifier mixed into every key
+            cache_file: SQLite path (default: EMBEDDING_CACHE_PATH or
+                embeddings.sqlite in default_cache_dir(); empty string = memory only)
+            max_memory_items: Size of the in-memory LRU tier
+                (default: EMBEDDING_CACHE_SIZE or 10000)
+        """
+        self.namespace = namespace
+        if cache_file is None:
+            cache_file = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(default_cache_dir(), "embeddings.sqlite"))
+        self.cache_file = os.path.abspath(os.path.expanduser(cache_file)) if cache_file else cache_file
+        self.max_memory_items = max_memory_items or int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+        self._memory = OrderedDict()  # key -> read-only vector, least recent first
+        self._lock = threading.Lock()
+        self._conn = self._open_disk_tier()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _open_disk_tier(self) -> Optional[sqlite3.Connection]:
+        """Open (and create) the SQLite store; None disables the disk tier"""
+        if not self.cache_file:
+            return None
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            conn.commit()
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            # Unwritable/uncreatable location: keep working from the memory tier
+            print(f"⚠️ Warning: Embedding cache disabled on disk ({self.cache_file}): {e}")
+            return None
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's namespace"""
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for many texts
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List aligned with texts: cached vector (read-only) or None
+        """
+        keys = [self.key(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        with self._lock:
+            missing: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self._conn is not None:
+                for key, vector in self._read_disk(list(missing)).items():
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        results[i] = vector
+                        self.disk_hits += 1
+
+            self.misses += sum(len(positions) for positions in missing.values())
+
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Store freshly computed embeddings in both tiers
+
+        Args:
+            texts: Input texts
+            vectors: Embeddings aligned with texts
+        """
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                vector = self._remember(key, vector)
+                rows.append((key, vector.shape[0], vector.tobytes()))
+
+            if rows and self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)", rows
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Warning: Failed to write embedding cache: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_items': len(self._memory),
+                'disk_enabled': self._conn is not None
+            }
+
+    def clear(self):
+        """Drop every cached vector (both tiers)"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> np.ndarray:
+        """Add to the LRU tier (caller holds the lock)"""
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+        return vector
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch vectors for keys from SQLite (caller holds the lock)"""
+        found = {}
+        try:
+            for start in range(0, len(keys), self._QUERY_CHUNK):
+                chunk = keys[start:start + self._QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                )
+                for key, dim, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if vector.shape[0] == dim:
+                        found[key] = vector
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Failed to read embedding cache: {e}")
+        return found
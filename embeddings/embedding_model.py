@@ -1,8 +1,113 @@
 # embeddings/embedding_model.py
 from sentence_transformers import SentenceTransformer
+from embeddings.embedding_cache import EmbeddingCache, default_cache_dir
+from embeddings.micro_batcher import MicroBatcher
 import numpy as np
-from typing import List, Union
+from typing import List, Optional, Union
 import os
+import time
+
+# Inference backends (EMBEDDING_BACKEND):
+# - 'torch': PyTorch (DEFAULT)
+# - 'onnx': ONNX Runtime, fp32
+# - 'onnx-int8': ONNX Runtime, dynamically quantized to int8
+# ONNX backends need `pip install sentence-transformers[onnx]`
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# Sample texts for checking a backend against PyTorch
+AGREEMENT_TEXTS = [
+    "Skills: Python, FastAPI, PostgreSQL, Docker | Backend Developer at Acme",
+    "Job: Machine Learning Engineer | Required Skills: PyTorch, NLP, AWS | Experience: 3+ years",
+    "Project: Resume matcher - semantic search over job postings with FAISS",
+    "Job: Frontend Developer | Required Skills: React, TypeScript, CSS | Experience: 1-2 years",
+    "B.Tech in Computer Science from IIT Delhi",
+]
+
+def load_sentence_transformer(model_name: str, backend: str = 'torch') -> SentenceTransformer:
+    """
+    Load a SentenceTransformer on the requested inference backend
+    
+    The int8 model is exported and quantized once, then reused from
+    EMBEDDING_ONNX_DIR (default: onnx/ in default_cache_dir()).
+    
+    Args:
+        model_name: HuggingFace model name
+        backend: One of EMBEDDING_BACKENDS
+        
+    Returns:
+        SentenceTransformer instance
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {EMBEDDING_BACKENDS})")
+    
+    if backend == 'torch':
+        return SentenceTransformer(model_name)
+    
+    if backend == 'onnx':
+        return SentenceTransformer(model_name, backend='onnx')
+    
+    # onnx-int8: dynamic quantization for the CPU instruction set in EMBEDDING_ONNX_QCONFIG
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    
+    qconfig = os.getenv("EMBEDDING_ONNX_QCONFIG", "avx2")
+    onnx_dir = os.getenv("EMBEDDING_ONNX_DIR") or os.path.join(default_cache_dir(), "onnx")
+    export_dir = os.path.join(os.path.abspath(os.path.expanduser(onnx_dir)), model_name.replace('/', '__'))
+    # Name the file explicitly: the exporter's default suffix comes from the
+    # config's weights dtype (e.g. quint8 for avx2), not a fixed "qint8"
+    file_suffix = f"qint8_{qconfig}"
+    file_name = f"onnx/model_{file_suffix}.onnx"
+    
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        print(f"⚙️ Exporting {model_name} to int8 ONNX ({qconfig})")
+        onnx_model = SentenceTransformer(model_name, backend='onnx')
+        onnx_model.save(export_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, qconfig, export_dir, file_suffix=file_suffix)
+    
+    return SentenceTransformer(export_dir, backend='onnx', model_kwargs={'file_name': file_name})
+
+def check_backend_agreement(model, reference, texts: Optional[List[str]] = None) -> dict:
+    """
+    Compare a backend's embeddings with a reference (PyTorch) model
+    
+    Args:
+        model, reference: SentenceTransformer instances
+        texts: Texts to encode (default: AGREEMENT_TEXTS)
+        
+    Returns:
+        Dict with min/mean cosine similarity between paired embeddings
+    """
+    texts = texts or AGREEMENT_TEXTS
+    a = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    b = reference.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    cosine = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {
+        'min_cosine': float(cosine.min()),
+        'mean_cosine': float(cosine.mean()),
+        'num_texts': len(texts)
+    }
+
+def dot_similarities(query_embedding: np.ndarray, matrix: np.ndarray, chunk_rows: int = 8192) -> np.ndarray:
+    """
+    Similarity of one query against every row of an (N × d) matrix
+    Both sides must already be L2-normalized, so cosine is a plain dot
+    product. float16 matrices are upcast chunk by chunk (numpy has no
+    float16 BLAS) to keep the temporary copy small.
+    
+    Args:
+        query_embedding: Normalized query vector (d,)
+        matrix: Normalized embeddings (N × d), float32 or float16
+        
+    Returns:
+        float32 array of N scores
+    """
+    query = np.asarray(query_embedding, dtype=np.float32)
+    if matrix.dtype == np.float32:
+        return matrix @ query
+    
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], chunk_rows):
+        scores[start:start + chunk_rows] = matrix[start:start + chunk_rows].astype(np.float32) @ query
+    return scores
 
 class EmbeddingModel:
     """
@@ -10,7 +115,7 @@ class EmbeddingModel:
     Using sentence-transformers (free, local, no API needed!)
     """
     
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name='all-MiniLM-L6-v2', cache_file=None, backend=None):
         """
         Initialize embedding model
         
@@ -19,36 +124,186 @@ class EmbeddingModel:
                 - 'all-MiniLM-L6-v2': Fast, good quality (DEFAULT)
                 - 'all-mpnet-base-v2': Slower, better quality
                 - 'paraphrase-multilingual': For multilingual support
+            cache_file: Embedding cache path (see EmbeddingCache;
+                empty string keeps the cache in memory only)
+            backend: 'torch', 'onnx' or 'onnx-int8' (default: EMBEDDING_BACKEND or 'torch')
         """
-        print(f"📥 Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        print(f"📥 Loading embedding model: {model_name} ({backend})")
+        self.model = load_sentence_transformer(model_name, backend)
         self.model_name = model_name
+        self.backend = backend
+        
+        # Opt-in: verify a non-torch backend against PyTorch, fall back if it drifts
+        if backend != 'torch' and os.getenv("EMBEDDING_BACKEND_CHECK", "false").lower() == "true":
+            min_cosine = float(os.getenv("EMBEDDING_BACKEND_MIN_COSINE", "0.99"))
+            reference = SentenceTransformer(model_name)
+            agreement = check_backend_agreement(self.model, reference)
+            print(f"🔍 {backend} vs torch: min cosine {agreement['min_cosine']:.4f}, mean {agreement['mean_cosine']:.4f}")
+            if agreement['min_cosine'] < min_cosine:
+                print(f"⚠️ {backend} backend below {min_cosine} agreement, falling back to torch")
+                self.model = reference
+                self.backend = 'torch'
+        
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        
+        # Vectors differ per backend (and are stored L2-normalized), so both are
+        # part of the cache namespace
+        self.cache = EmbeddingCache(namespace=f"{model_name}:{self.backend}:normalized", cache_file=cache_file)
+        
+        # Concurrent single-text encodes (one per request) share model calls
+        self.batcher = None
+        if os.getenv("EMBEDDING_MICRO_BATCH", "true").lower() == "true":
+            self.batcher = MicroBatcher(self._encode_many)
         print(f"✅ Model loaded | Dimension: {self.embedding_dim}")
     
+    def _encode_many(self, texts: List[str]) -> np.ndarray:
+        """Uncached batch encode straight through the model"""
+        return self.model.encode(
+            texts, 
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+    
     def encode_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for single text
         
+        Args:
+            text: Input text
+            
+        Returns:
+            L2-normalized embedding vector (numpy array)
+        """
+        cached = self.cache.get_many([text])[0]
+        if cached is not None:
+            return cached.copy()
+        
+        if self.batcher is not None:
+            embedding = self.batcher.encode(text)
+        else:
+            embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        self.cache.put_many([text], embedding[np.newaxis, :])
+        return embedding
+    
+    async def encode_text_async(self, text: str) -> np.ndarray:
+        """
+        Awaitable encode_text for coroutines (no thread hop needed)
+        
         Args:
             text: Input text
             
         Returns:
             Embedding vector (numpy array)
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
+        cached = self.cache.get_many([text])[0]
+        if cached is not None:
+            return cached.copy()
+        
+        if self.batcher is not None:
+            embedding = await self.batcher.encode_async(text)
+        else:
+            embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        self.cache.put_many([text], embedding[np.newaxis, :])
         return embedding
     
     def encode_batch(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts (faster than one-by-one)
+        Only texts missing from the cache are sent to the model.
         """
-        embeddings = self.model.encode(
-            texts, 
-            convert_to_numpy=True,
-            show_progress_bar=False
-        )
-        return embeddings
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        
+        cached = self.cache.get_many(texts)
+        
+        # Encode each distinct uncached text once
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        computed = {}
+        if missing:
+            embeddings = self._encode_many(missing)
+            self.cache.put_many(missing, embeddings)
+            computed = dict(zip(missing, embeddings))
+        
+        return np.vstack([
+            vector if vector is not None else computed[text]
+            for text, vector in zip(texts, cached)
+        ]).astype(np.float32)
+    
+    def encode_bulk(self, texts: List[str], batch_size: Optional[int] = None,
+                    num_processes: Optional[int] = None, chunk_size: int = 4096) -> np.ndarray:
+        """
+        Encode a large corpus (index builds, backfills) with progress output
+        
+        Like encode_batch, only distinct uncached texts reach the model. They
+        are encoded chunk by chunk in large model batches - optionally spread
+        over CPU worker processes with SentenceTransformer's multi-process
+        pool - and each chunk is written to the cache as it finishes, so an
+        interrupted backfill resumes where it stopped.
+        
+        Args:
+            texts: Input texts
+            batch_size: Model batch size (default: EMBEDDING_BULK_BATCH_SIZE or 128)
+            num_processes: Worker processes (default: EMBEDDING_BULK_PROCESSES
+                or 0 = encode in this process)
+            chunk_size: Texts per progress/cache step
+            
+        Returns:
+            L2-normalized embeddings (len(texts) × embedding_dim)
+        """
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        batch_size = batch_size or int(os.getenv("EMBEDDING_BULK_BATCH_SIZE", "128"))
+        if num_processes is None:
+            num_processes = int(os.getenv("EMBEDDING_BULK_PROCESSES", "0"))
+        
+        cached = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        computed = {}
+        
+        if missing:
+            pool = None
+            if num_processes > 1:
+                pool = self.model.start_multi_process_pool(target_devices=['cpu'] * num_processes)
+            try:
+                start = time.perf_counter()
+                for offset in range(0, len(missing), chunk_size):
+                    chunk = missing[offset:offset + chunk_size]
+                    if pool is not None:
+                        embeddings = self.model.encode_multi_process(
+                            chunk, pool, batch_size=batch_size, normalize_embeddings=True
+                        )
+                    else:
+                        embeddings = self.model.encode(
+                            chunk,
+                            batch_size=batch_size,
+                            convert_to_numpy=True,
+                            normalize_embeddings=True,
+                            show_progress_bar=False
+                        )
+                    self.cache.put_many(chunk, embeddings)
+                    computed.update(zip(chunk, embeddings))
+                    
+                    done = offset + len(chunk)
+                    if len(missing) > chunk_size:
+                        rate = done / max(time.perf_counter() - start, 1e-9)
+                        print(f"   ⏳ Encoded {done}/{len(missing)} texts ({rate:.0f} texts/s)")
+            finally:
+                if pool is not None:
+                    self.model.stop_multi_process_pool(pool)
+        
+        return np.vstack([
+            vector if vector is not None else computed[text]
+            for text, vector in zip(texts, cached)
+        ]).astype(np.float32)
+    
+    def cache_stats(self) -> dict:
+        """Embedding cache hit/miss counters (plus micro-batching counters)"""
+        stats = self.cache.stats()
+        if self.batcher is not None:
+            stats['micro_batching'] = self.batcher.stats()
+        return stats
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """LangChain compatibility: embed multiple texts"""
@@ -78,6 +333,10 @@ class EmbeddingModel:
         Returns:
             Resume embedding vector
         """
+        return self.encode_text(self.resume_to_text(resume))
+    
+    def resume_to_text(self, resume) -> str:
+        """Build the text representation of a resume that gets embedded"""
         # Build comprehensive text representation
         parts = []
         
@@ -106,9 +365,7 @@ class EmbeddingModel:
             parts.append(resume.summary)
         
         # Combine all parts
-        resume_text = " | ".join(parts)
-        
-        return self.encode_text(resume_text)
+        return " | ".join(parts)
     
     def encode_job(self, job) -> np.ndarray:
         """
@@ -121,6 +378,10 @@ class EmbeddingModel:
         Returns:
             Job embedding vector
         """
+        return self.encode_text(self.job_to_text(job))
+    
+    def job_to_text(self, job) -> str:
+        """Build the text representation of a job that gets embedded"""
         parts = []
         
         # Job title
@@ -134,32 +395,40 @@ class EmbeddingModel:
         parts.append(f"Experience: {job.experience_required}")
         
         # Combine all parts
-        job_text = " | ".join(parts)
-        
-        return self.encode_text(job_text)
+        return " | ".join(parts)
     
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compute cosine similarity between two embeddings
         
         Args:
-            embedding1, embedding2: Embedding vectors
+            embedding1, embedding2: Embedding vectors from this model
+                (already L2-normalized, so cosine is the dot product)
             
         Returns:
             Similarity score (0 to 1, higher = more similar)
         """
-        # Cosine similarity
-        similarity = np.dot(embedding1, embedding2) / (
-            np.linalg.norm(embedding1) * np.linalg.norm(embedding2)
-        )
-        return float(similarity)
+        return float(np.dot(embedding1, embedding2))
+    
+    def compute_similarities(self, query_embedding: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of one embedding against many (see dot_similarities)
+        
+        Args:
+            query_embedding: Embedding vector from this model
+            embeddings: (N × embedding_dim) matrix of embeddings from this model
+            
+        Returns:
+            Array of N similarity scores
+        """
+        return dot_similarities(query_embedding, embeddings)
 
 # Global instance (load once, reuse)
 _embedding_model = None
 
-def get_embedding_model(model_name='all-MiniLM-L6-v2'):
+def get_embedding_model(model_name='all-MiniLM-L6-v2', backend=None):
     """Get global embedding model instance"""
     global _embedding_model
     if _embedding_model is None:
-        _embedding_model = EmbeddingModel(model_name)
+        _embedding_model = EmbeddingModel(model_name, backend=backend)
     return _embedding_model
\ No newline at end of file
@@ -0,0 +1,555 @@
+# embeddings/job_catalog.py
+import os
+import threading
+import heapq
+import numpy as np
+from collections import Counter
+from scipy.sparse import csr_matrix
+from typing import Dict, Iterable, List, Optional, Tuple
+from embeddings.embedding_model import dot_similarities
+from skill_ontology import SkillOntology, ONTOLOGY
+from utils.experience import parse_experience_requirement
+
+class JobCatalog:
+    """
+    Parsed jobs plus a precomputed job embedding matrix
+    Behaves like the old job_cache dict (job_id -> JobDescription) but keeps
+    an L2-normalized (N × embedding_dim) matrix in sync with its contents,
+    so one resume can be scored against every job with a single BLAS call.
+    An inverted skill index (canonical skill -> job IDs) backs candidate
+    retrieval for two-stage matching (see candidates), and a sparse
+    (N × skills) matrix scores skill overlap for every job at once
+    (see skill_overlap). Scoring reads a CatalogSnapshot (see snapshot), so
+    a concurrent refresh cannot shift rows under a match.
+    """
+
+    def __init__(self, embedding_model, dtype: Optional[str] = None):
+        """
+        Initialize empty catalog
+
+        Args:
+            embedding_model: EmbeddingModel used to encode jobs
+            dtype: Storage dtype for the matrix, 'float32' or 'float16'
+                (default: JOB_EMBEDDING_DTYPE or 'float32'); float16 halves
+                memory at ~1e-3 score precision
+        """
+        self.embedding_model = embedding_model
+        self.dtype = np.dtype(dtype or os.getenv("JOB_EMBEDDING_DTYPE", "float32"))
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported embedding dtype: {self.dtype}")
+
+        # Row order == insertion order (same iteration order as a dict)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._jobs: Dict[str, object] = {}
+
+        # Embedding matrices, rows aligned with self._ids: full job text and
+        # lowercased job title (for title similarity)
+        self._embeddings = np.zeros((0, embedding_model.embedding_dim), dtype=self.dtype)
+        self._title_embeddings = np.zeros((0, embedding_model.embedding_dim), dtype=self.dtype)
+
+        # Jobs added since the matrix was last synced (appended on sync), and
+        # existing jobs replaced since then (their rows re-encoded in place)
+        self._pending: List[str] = []
+        self._stale: set = set()
+
+        # Canonical job skill -> IDs of jobs requiring it
+        self._skill_index: Dict[str, set] = {}
+        
+        # Skill vocabulary: ontology IDs first, unknown skills appended as seen
+        self._skill_columns: Dict[str, int] = dict(ONTOLOGY.skill_ids)
+        # job_id -> skill column indices; the CSR matrix is rebuilt lazily from these
+        self._job_skill_columns: Dict[str, np.ndarray] = {}
+        self._skill_matrix: Optional[csr_matrix] = None
+
+        # Skill depth uses the raw lowercased job skills (not canonical names):
+        # lowercase vocabulary, job_id -> (columns, counts), lazily built CSR
+        self._depth_columns: Dict[str, int] = {}
+        self._job_depth_columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._depth_matrix: Optional[csr_matrix] = None
+
+        # job_id -> (min_years, max_years), NaN where missing; array rebuilt lazily
+        self._job_experience: Dict[str, Tuple[float, float]] = {}
+        self._experience_ranges: Optional[np.ndarray] = None
+
+        # Requests are served from a thread pool, so refreshes and lazy
+        # syncs can overlap with matching
+        self._lock = threading.RLock()
+
+        # Bumped on every add/replace/remove; keys caches of per-job scores
+        self.version = 0
+
+    # ---------- dict-like interface ----------
+
+    def __setitem__(self, job_id: str, job):
+        with self._lock:
+            if job_id in self._rows:
+                # Re-parsed job: keep its row, re-index it and re-encode the
+                # row in place on the next sync (batched with other changes)
+                self._unindex(job_id)
+                if self._rows[job_id] < len(self._ids) - len(self._pending):
+                    # (rows in the pending tail get encoded on sync anyway)
+                    self._stale.add(job_id)
+            else:
+                self._rows[job_id] = len(self._ids)
+                self._ids.append(job_id)
+                self._pending.append(job_id)
+            self._jobs[job_id] = job
+            self._index(job_id, job)
+            self.version += 1
+
+    def _index(self, job_id: str, job):
+        """Add a job to the skill index, vocabularies and per-job arrays"""
+        skills = self._job_skills(job)
+        for skill in skills:
+            self._skill_index.setdefault(skill, set()).add(job_id)
+            self._skill_columns.setdefault(skill, len(self._skill_columns))
+        self._job_skill_columns[job_id] = np.array(
+            sorted(self._skill_columns[skill] for skill in skills), dtype=np.int32
+        )
+        self._skill_matrix = None
+        lowered = Counter(s.lower() for s in (getattr(job, 'technical_skills', None) or []))
+        for skill in lowered:
+            self._depth_columns.setdefault(skill, len(self._depth_columns))
+        self._job_depth_columns[job_id] = (
+            np.array([self._depth_columns[skill] for skill in lowered], dtype=np.int32),
+            np.array(list(lowered.values()), dtype=np.int32)
+        )
+        self._depth_matrix = None
+        self._job_experience[job_id] = self._experience_range(job)
+        self._experience_ranges = None
+
+    def _unindex(self, job_id: str):
+        """Inverse of _index (the vocabularies are append-only and keep their columns)"""
+        for skill in self._job_skills(self._jobs[job_id]):
+            holders = self._skill_index.get(skill)
+            if holders is not None:
+                holders.discard(job_id)
+                if not holders:
+                    del self._skill_index[skill]
+        del self._job_skill_columns[job_id]
+        self._skill_matrix = None
+        del self._job_depth_columns[job_id]
+        self._depth_matrix = None
+        del self._job_experience[job_id]
+        self._experience_ranges = None
+
+    def __getitem__(self, job_id: str):
+        return self._jobs[job_id]
+
+    def __delitem__(self, job_id: str):
+        self.remove(job_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(list(self._ids))
+
+    def get(self, job_id: str, default=None):
+        return self._jobs.get(job_id, default)
+
+    def keys(self) -> List[str]:
+        return list(self._ids)
+
+    def items(self) -> List[Tuple[str, object]]:
+        return [(job_id, self._jobs[job_id]) for job_id in self._ids]
+
+    def values(self) -> List[object]:
+        return [self._jobs[job_id] for job_id in self._ids]
+
+    def remove(self, job_id: str):
+        """Remove a job and its embedding row"""
+        self.remove_many([job_id])
+
+    def remove_many(self, job_ids: Iterable[str]) -> int:
+        """
+        Remove several jobs with one compaction of the matrices
+        (unknown IDs are skipped)
+
+        Returns:
+            Number of jobs removed
+        """
+        with self._lock:
+            job_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id in self._rows]
+            if not job_ids:
+                return 0
+            self._sync()
+            rows = [self._rows[job_id] for job_id in job_ids]
+            for job_id in job_ids:
+                self._unindex(job_id)
+                del self._jobs[job_id]
+            self.version += 1
+
+            self._embeddings = np.delete(self._embeddings, rows, axis=0)
+            self._title_embeddings = np.delete(self._title_embeddings, rows, axis=0)
+            removed = set(job_ids)
+            self._ids = [job_id for job_id in self._ids if job_id not in removed]
+            self._rows = {job_id: row for row, job_id in enumerate(self._ids)}
+            return len(job_ids)
+
+    # ---------- embeddings ----------
+
+    def _sync(self):
+        """
+        Encode added and replaced jobs (text and title) in one batch each:
+        new rows are appended, replaced rows are overwritten in place
+        """
+        with self._lock:
+            if not self._pending and not self._stale:
+                return
+
+            # Rows for new jobs are always the tail of self._ids
+            stale = list(self._stale)
+            pending = self._pending
+            self._stale = set()
+            self._pending = []
+            changed = stale + pending
+            num_stale = len(stale)
+            stale_rows = np.array([self._rows[job_id] for job_id in stale], dtype=np.int64)
+
+            # The model returns L2-normalized vectors; only the storage dtype changes
+            texts = [self.embedding_model.job_to_text(self._jobs[job_id]) for job_id in changed]
+            vectors = np.asarray(self.embedding_model.encode_bulk(texts), dtype=self.dtype)
+
+            # Same text as WeightedScorer.calculate_title_similarity encodes
+            titles = [(self._jobs[job_id].job_title or "").lower() for job_id in changed]
+            title_vectors = np.asarray(self.embedding_model.encode_bulk(titles), dtype=self.dtype)
+
+            # vstack always returns a new array, so snapshots holding the old
+            # matrices never see the in-place row updates
+            embeddings = np.ascontiguousarray(np.vstack([self._embeddings, vectors[num_stale:]]))
+            embeddings[stale_rows] = vectors[:num_stale]
+            self._embeddings = embeddings
+
+            title_embeddings = np.ascontiguousarray(np.vstack([self._title_embeddings, title_vectors[num_stale:]]))
+            title_embeddings[stale_rows] = title_vectors[:num_stale]
+            self._title_embeddings = title_embeddings
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """L2-normalized job embedding matrix (rows aligned with keys())"""
+        with self._lock:
+            self._sync()
+            return self._embeddings
+
+    @property
+    def title_embeddings(self) -> np.ndarray:
+        """L2-normalized lowercased job-title embedding matrix (rows aligned with keys())"""
+        with self._lock:
+            self._sync()
+            return self._title_embeddings
+
+    def rows_for(self, job_ids: Iterable[str]) -> np.ndarray:
+        """Matrix row indices for the given job IDs (unknown IDs are skipped)"""
+        with self._lock:
+            return np.array([self._rows[job_id] for job_id in job_ids if job_id in self._rows], dtype=np.int64)
+
+    def similarities(self, query_embedding: np.ndarray, job_ids: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Cosine similarity between one query and many jobs
+
+        Args:
+            query_embedding: Normalized query vector from the same model
+                (e.g. resume embedding)
+            job_ids: Optional subset of job IDs (default: whole catalog)
+
+        Returns:
+            Array of similarity scores aligned with job_ids (or keys())
+        """
+        with self._lock:
+            matrix = self.embeddings
+            if job_ids is not None:
+                matrix = matrix[self.rows_for(job_ids)]
+
+        return dot_similarities(query_embedding, matrix)
+
+    # ---------- snapshots ----------
+
+    def snapshot(self, job_ids: Optional[Iterable[str]] = None) -> 'CatalogSnapshot':
+        """
+        Consistent read-only view of the catalog (or of job_ids, in that order;
+        unknown IDs are skipped) for one scoring pass
+
+        Every matrix is taken under the lock in one go. Adds and removes
+        replace the matrices instead of writing into them, so the snapshot
+        holds references (slices for a subset) and never changes afterwards.
+        """
+        with self._lock:
+            self._sync()
+            if job_ids is None:
+                ids = list(self._ids)
+                take = lambda matrix: matrix
+            else:
+                ids = [job_id for job_id in job_ids if job_id in self._rows]
+                rows = np.array([self._rows[job_id] for job_id in ids], dtype=np.int64)
+                take = lambda matrix: matrix[rows]
+            return CatalogSnapshot(
+                job_ids=ids,
+                jobs=[self._jobs[job_id] for job_id in ids],
+                embeddings=take(self._embeddings),
+                title_embeddings=take(self._title_embeddings),
+                skill_matrix=take(self.skill_matrix),
+                depth_matrix=take(self.depth_matrix),
+                experience_ranges=take(self.experience_ranges),
+                skill_columns=self._skill_columns,
+                depth_columns=self._depth_columns,
+                version=self.version
+            )
+
+    # ---------- candidate retrieval ----------
+
+    @staticmethod
+    def _job_skills(job) -> set:
+        """Canonical skill names a job requires (same normalization as WeightedScorer)"""
+        skills = set(SkillOntology.normalize_skill(s) for s in (getattr(job, 'technical_skills', None) or []))
+        skills.discard("")
+        return skills
+
+    @staticmethod
+    def expand_skills(skills: Iterable[str]) -> set:
+        """
+        Canonical resume skills plus the parents they imply
+        (a resume with "PyTorch" satisfies a job asking for "Machine Learning")
+        """
+        expanded = set(skills) | SkillOntology.get_implied_skills(skills)
+        expanded.discard("")
+        return expanded
+
+    def candidates(self, query_embedding: np.ndarray, skills: Iterable[str],
+                   num_candidates: int) -> Tuple['CatalogSnapshot', np.ndarray]:
+        """
+        Stage one of two-stage matching: a cheap shortlist of jobs worth fully scoring
+
+        The shortlist is the union of the num_candidates most similar jobs by
+        embedding and the num_candidates jobs whose required skills the query
+        covers best (via the inverted skill index; coverage is what drives the
+        40% skill_match weight), so a strong skill match that is phrased
+        differently is not lost to the embedding cut.
+
+        Args:
+            query_embedding: Normalized query vector (e.g. resume embedding)
+            skills: Canonical query skills (e.g. build_resume_profile()['canonical_skills'])
+            num_candidates: Size of each of the two shortlists
+
+        Returns:
+            (snapshot of the candidates in catalog order, their semantic
+            scores), both taken under one lock so they describe the same jobs
+        """
+        with self._lock:
+            scores = self.similarities(query_embedding)
+            ids = list(self._ids)
+            if num_candidates >= len(ids):
+                return self.snapshot(), scores
+
+            # Embedding shortlist
+            rows = set(np.argpartition(-scores, num_candidates - 1)[:num_candidates].tolist())
+
+            # Skill shortlist: best coverage of the job's skills first, then most
+            # shared skills, ties to the earlier job
+            overlap = Counter()
+            for skill in self.expand_skills(skills):
+                overlap.update(self._skill_index.get(skill, ()))
+            best = heapq.nlargest(
+                num_candidates,
+                overlap.items(),
+                key=lambda item: (item[1] / len(self._job_skill_columns[item[0]]), item[1], -self._rows[item[0]])
+            )
+            rows.update(self._rows[job_id] for job_id, _ in best)
+
+            rows = np.array(sorted(rows), dtype=np.int64)
+            return self.snapshot([ids[row] for row in rows]), scores[rows]
+
+    # ---------- skill matrix ----------
+
+    @staticmethod
+    def _csr(rows: List[np.ndarray], data: Optional[List[np.ndarray]], width: int) -> csr_matrix:
+        """CSR matrix from per-row column arrays (data: per-row values, default all ones)"""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        values = np.concatenate(data) if data else np.ones(len(indices), dtype=np.int32)
+        return csr_matrix((values, indices, indptr), shape=(len(rows), width))
+
+    @property
+    def skill_matrix(self) -> csr_matrix:
+        """Binary (N × skill vocabulary) CSR matrix of canonical job skills (rows aligned with keys())"""
+        with self._lock:
+            if self._skill_matrix is None:
+                self._skill_matrix = self._csr(
+                    [self._job_skill_columns[job_id] for job_id in self._ids], None, len(self._skill_columns)
+                )
+            return self._skill_matrix
+
+    @property
+    def depth_matrix(self) -> csr_matrix:
+        """(N × lowercase skill vocabulary) CSR matrix of job skill counts (rows aligned with keys())"""
+        with self._lock:
+            if self._depth_matrix is None:
+                entries = [self._job_depth_columns[job_id] for job_id in self._ids]
+                self._depth_matrix = self._csr(
+                    [columns for columns, _ in entries],
+                    [counts for _, counts in entries] if entries else None,
+                    len(self._depth_columns)
+                )
+            return self._depth_matrix
+
+    def skill_overlap(self, canonical_skills: Iterable[str], implied_skills: Optional[Iterable[str]] = None,
+                      job_ids: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Skill overlap counts for the whole catalog or job_ids (see CatalogSnapshot.skill_overlap)"""
+        return self.snapshot(job_ids).skill_overlap(canonical_skills, implied_skills)
+
+    # ---------- experience ranges ----------
+
+    @staticmethod
+    def _experience_range(job) -> Tuple[float, float]:
+        """Parsed (min_years, max_years) of a job, NaN where missing"""
+        min_years = getattr(job, 'experience_min_years', None)
+        max_years = getattr(job, 'experience_max_years', None)
+        if min_years is None and max_years is None:
+            # Jobs built without the parsed columns (older rows, ad-hoc JobDescriptions)
+            min_years, max_years = parse_experience_requirement(getattr(job, 'experience_required', None))
+        return (
+            np.nan if min_years is None else float(min_years),
+            np.nan if max_years is None else float(max_years)
+        )
+
+    @property
+    def experience_ranges(self) -> np.ndarray:
+        """(N × 2) float array of required (min_years, max_years), NaN where missing (rows aligned with keys())"""
+        with self._lock:
+            if self._experience_ranges is None:
+                ranges = np.full((len(self._ids), 2), np.nan)
+                for row, job_id in enumerate(self._ids):
+                    ranges[row] = self._job_experience[job_id]
+                self._experience_ranges = ranges
+            return self._experience_ranges
+
+    def skill_depth_totals(self, skill_depth: Dict[str, int],
+                           job_ids: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Resume skill depth totals for the whole catalog or job_ids (see CatalogSnapshot.skill_depth_totals)"""
+        return self.snapshot(job_ids).skill_depth_totals(skill_depth)
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of a JobCatalog's jobs and matrices at one version
+    (see JobCatalog.snapshot). Every array is row-aligned with job_ids, so
+    one scoring pass reads the same jobs from start to finish.
+    """
+
+    def __init__(self, job_ids: List[str], jobs: List[object], embeddings: np.ndarray,
+                 title_embeddings: np.ndarray, skill_matrix: csr_matrix, depth_matrix: csr_matrix,
+                 experience_ranges: np.ndarray, skill_columns: Dict[str, int],
+                 depth_columns: Dict[str, int], version: int):
+        """
+        Args:
+            job_ids, jobs: Job IDs and JobDescriptions, in row order
+            embeddings, title_embeddings: Normalized job text / title embeddings
+            skill_matrix: Binary (N × skill vocabulary) canonical job skills
+            depth_matrix: (N × lowercase skill vocabulary) job skill counts
+            experience_ranges: (N × 2) required (min_years, max_years), NaN where missing
+            skill_columns, depth_columns: The catalog's vocabularies (append-only,
+                so columns past the matrix widths are ignored)
+            version: JobCatalog.version the snapshot was taken at
+        """
+        self.job_ids = job_ids
+        self.jobs = jobs
+        self.embeddings = embeddings
+        self.title_embeddings = title_embeddings
+        self.skill_matrix = skill_matrix
+        self.depth_matrix = depth_matrix
+        self.experience_ranges = experience_ranges
+        self._skill_columns = skill_columns
+        self._depth_columns = depth_columns
+        self.version = version
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def keys(self) -> List[str]:
+        return list(self.job_ids)
+
+    def snapshot(self, job_ids: Optional[Iterable[str]] = None) -> 'CatalogSnapshot':
+        """This snapshot, or the subset for job_ids (in that order; unknown IDs are skipped)"""
+        if job_ids is None:
+            return self
+        positions = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        ids = [job_id for job_id in job_ids if job_id in positions]
+        rows = np.array([positions[job_id] for job_id in ids], dtype=np.int64)
+        return CatalogSnapshot(
+            ids, [self.jobs[row] for row in rows], self.embeddings[rows], self.title_embeddings[rows],
+            self.skill_matrix[rows], self.depth_matrix[rows], self.experience_ranges[rows],
+            self._skill_columns, self._depth_columns, self.version
+        )
+
+    def similarities(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity between one normalized query and every job in the snapshot"""
+        return dot_similarities(query_embedding, self.embeddings)
+
+    def _skill_vector(self, skills: Iterable[str], width: int) -> np.ndarray:
+        """Indicator vector over the skill vocabulary (skills no job requires are dropped)"""
+        vector = np.zeros(width, dtype=np.int32)
+        columns = [self._skill_columns.get(skill) for skill in skills]
+        columns = [c for c in columns if c is not None and c < width]
+        vector[columns] = 1
+        return vector
+
+    def skill_overlap(self, canonical_skills: Iterable[str],
+                      implied_skills: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Skill overlap counts between one resume and every job, via sparse products
+
+        Mirrors WeightedScorer.calculate_skill_match_score: a job skill is
+        matched when the resume has it or implies it (hierarchy ancestor);
+        extra skills are resume skills the job does not ask for.
+
+        Args:
+            canonical_skills: Canonical resume skills (build_resume_profile()['canonical_skills'])
+            implied_skills: Their hierarchy ancestors (default: computed)
+
+        Returns:
+            Dict of int arrays aligned with job_ids: num_matched, num_required, num_extra
+        """
+        canonical_skills = set(canonical_skills)
+        canonical_skills.discard("")
+        if implied_skills is None:
+            implied_skills = SkillOntology.get_implied_skills(canonical_skills)
+
+        matrix = self.skill_matrix
+        width = matrix.shape[1]
+        have = self._skill_vector(canonical_skills | set(implied_skills), width)
+        own = self._skill_vector(canonical_skills, width)
+
+        return {
+            'num_matched': matrix @ have,
+            'num_required': np.diff(matrix.indptr),
+            'num_extra': len(canonical_skills) - matrix @ own
+        }
+
+    def skill_depth_totals(self, skill_depth: Dict[str, int]) -> Dict[str, np.ndarray]:
+        """
+        Resume skill depth summed over each job's skills, via one sparse product
+
+        Args:
+            skill_depth: Lowercased resume skill -> depth
+                (build_resume_profile()['skill_depth'])
+
+        Returns:
+            Dict of int arrays aligned with job_ids: total_depth,
+            num_required (number of listed job skills, duplicates included)
+        """
+        matrix = self.depth_matrix
+        depth = np.zeros(matrix.shape[1], dtype=np.int64)
+        for skill, value in skill_depth.items():
+            column = self._depth_columns.get(skill)
+            if column is not None and column < matrix.shape[1]:
+                depth[column] = value
+
+        return {
+            'total_depth': matrix @ depth,
+            'num_required': np.asarray(matrix.sum(axis=1)).ravel()
+        }
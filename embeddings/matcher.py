@@ -5,9 +5,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from embeddings.embedding_model import get_embedding_model
 from embeddings.vector_store import VectorStore
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from skill_ontology import SkillOntology
 import numpy as np
+import time
 
 class ResumeJobMatcher:
     """
@@ -22,47 +23,115 @@ class ResumeJobMatcher:
         self.job_store = None
         self.resume_store = None
     
-    def build_job_index(self, jobs: List[Tuple[str, any]]):
+    @staticmethod
+    def job_attributes(job, extra: Optional[Dict] = None) -> Dict:
+        """
+        Filterable fields for a job: location/job_type/company from the parsed
+        job, plus any extra fields (e.g. source, is_remote, posted_at from the DB row)
+        """
+        attributes = {
+            'location': getattr(job, 'location', None),
+            'job_type': getattr(job, 'job_type', None),
+            'company': getattr(job, 'company', None)
+        }
+        attributes.update(extra or {})
+        return attributes
+
+    def build_job_index(self, jobs: List[Tuple[str, any]], attributes: Optional[List[Dict]] = None,
+                        num_processes: Optional[int] = None):
         """
         Build vector index for jobs
         
+        All job texts are encoded in bulk (see EmbeddingModel.encode_bulk) and
+        added to the store in a single add_batch call.
+        
         Args:
             jobs: List of (job_id, job_object) tuples
+            attributes: Optional extra filterable fields per job (see job_attributes)
+            num_processes: Optional encoder worker processes (see encode_bulk)
         """
         print(f"🔨 Building job index for {len(jobs)} jobs...")
+        start = time.perf_counter()
         
-        self.job_store = VectorStore(embedding_dim=self.embedding_model.embedding_dim)
+        self.job_store = VectorStore(embedding_dim=self.embedding_model.embedding_dim, normalize=False)
         
-        for job_id, job in jobs:
-            embedding = self.embedding_model.encode_job(job)
-            self.job_store.add(
-                embedding, 
-                job_id,
-                metadata={'job': job}
-            )
+        embeddings = self.embedding_model.encode_bulk(
+            [self.embedding_model.job_to_text(job) for _, job in jobs],
+            num_processes=num_processes
+        )
+        self.job_store.add_batch(
+            embeddings,
+            [job_id for job_id, _ in jobs],
+            [{'job': job} for _, job in jobs],
+            [self.job_attributes(job, attributes[i] if attributes else None) for i, (_, job) in enumerate(jobs)]
+        )
         
-        print(f"✅ Job index built | {len(self.job_store)} jobs indexed")
-    
-    def build_resume_index(self, resumes: List[Tuple[str, any]]):
+        elapsed = time.perf_counter() - start
+        print(f"✅ Job index built | {len(self.job_store)} jobs indexed in {elapsed:.1f}s "
+              f"({len(jobs) / max(elapsed, 1e-9):.0f} jobs/s)")
+
+    def upsert_jobs(self, jobs: List[Tuple[str, any]], attributes: Optional[List[Dict]] = None):
+        """
+        Add new or re-parsed jobs to the index without rebuilding it
+
+        Args:
+            jobs: List of (job_id, job_object) tuples
+            attributes: Optional extra filterable fields per job (see job_attributes)
+        """
+        if self.job_store is None:
+            return self.build_job_index(jobs, attributes)
+        if not jobs:
+            return
+
+        texts = [self.embedding_model.job_to_text(job) for _, job in jobs]
+        self.job_store.upsert(
+            self.embedding_model.encode_batch(texts),
+            [job_id for job_id, _ in jobs],
+            [{'job': job} for _, job in jobs],
+            [self.job_attributes(job, attributes[i] if attributes else None) for i, (_, job) in enumerate(jobs)]
+        )
+        print(f"✅ Job index updated | {len(jobs)} upserted, {len(self.job_store)} jobs indexed")
+
+    def remove_jobs(self, job_ids: List[str]) -> int:
+        """
+        Drop expired/deleted jobs from the index
+
+        Args:
+            job_ids: IDs to remove
+
+        Returns:
+            Number of jobs removed
+        """
+        if self.job_store is None:
+            return 0
+        return self.job_store.remove(job_ids)
+
+    def build_resume_index(self, resumes: List[Tuple[str, any]], num_processes: Optional[int] = None):
         """
         Build vector index for resumes
         
         Args:
             resumes: List of (resume_id, resume_object) tuples
+            num_processes: Optional encoder worker processes (see encode_bulk)
         """
         print(f"🔨 Building resume index for {len(resumes)} resumes...")
+        start = time.perf_counter()
         
-        self.resume_store = VectorStore(embedding_dim=self.embedding_model.embedding_dim)
+        self.resume_store = VectorStore(embedding_dim=self.embedding_model.embedding_dim, normalize=False)
         
-        for resume_id, resume in resumes:
-            embedding = self.embedding_model.encode_resume(resume)
-            self.resume_store.add(
-                embedding,
-                resume_id,
-                metadata={'resume': resume}
-            )
+        embeddings = self.embedding_model.encode_bulk(
+            [self.embedding_model.resume_to_text(resume) for _, resume in resumes],
+            num_processes=num_processes
+        )
+        self.resume_store.add_batch(
+            embeddings,
+            [resume_id for resume_id, _ in resumes],
+            [{'resume': resume} for _, resume in resumes]
+        )
         
-        print(f"✅ Resume index built | {len(self.resume_store)} resumes indexed")
+        elapsed = time.perf_counter() - start
+        print(f"✅ Resume index built | {len(self.resume_store)} resumes indexed in {elapsed:.1f}s "
+              f"({len(resumes) / max(elapsed, 1e-9):.0f} resumes/s)")
     
     def calculate_skill_overlap(self, resume_skills: List[str], job_skills: List[str]) -> Dict:
         """
@@ -74,15 +143,14 @@ class ResumeJobMatcher:
         resume_set = set(resume_skills)
         job_set = set(job_skills)
         
-        # Skill Hierarchy Logic: Parent requirements can be met by specialized child skills
-        matched = set()
-        for job_skill in job_set:
-            # Get all specialized/equivalent skills for this job requirement
-            equivalent_skills = SkillOntology.get_equivalent_skills(job_skill)
-            
-            # If any of these specialized skills exist in the resume, it's a match
-            if any(req_skill in resume_set for req_skill in equivalent_skills):
-                matched.add(job_skill)
+        # Skill Hierarchy Logic: Parent requirements can be met by specialized child skills.
+        # Every ancestor of a resume skill counts as present (compiled ontology closure),
+        # so each job skill is a single set lookup
+        implied = SkillOntology.get_implied_skills(SkillOntology.normalize_skill(s) for s in resume_set)
+        matched = {
+            job_skill for job_skill in job_set
+            if job_skill in resume_set or SkillOntology.normalize_skill(job_skill) in implied
+        }
         
         missing = job_set - matched
         extra = resume_set - matched
@@ -101,59 +169,90 @@ class ResumeJobMatcher:
             'num_required': len(job_set)
         }
     
-    def match_resume_to_jobs(self, resume, top_k: int = 10) -> List[Dict]:
+    def _score_candidate(self, resume, job, semantic_score: float) -> Dict:
+        """Skill overlap + combined score for one resume/job pair"""
+        # Skill overlap
+        skill_metrics = self.calculate_skill_overlap(
+            resume.technical_skills,
+            job.technical_skills
+        )
+        
+        # Combined score (weighted average)
+        combined_score = (
+            0.6 * semantic_score +  # 60% semantic similarity
+            0.4 * skill_metrics['skill_match_score']  # 40% skill match
+        )
+        
+        return {
+            'semantic_score': semantic_score,
+            'skill_match_score': skill_metrics['skill_match_score'],
+            'combined_score': combined_score,
+            'matched_skills': skill_metrics['matched_skills'],
+            'missing_skills': skill_metrics['missing_skills'],
+            'num_matched': skill_metrics['num_matched'],
+            'num_required': skill_metrics['num_required']
+        }
+    
+    def match_resume_to_jobs(self, resume, top_k: int = 10, filters: Optional[Dict] = None) -> List[Dict]:
         """
         Find top K matching jobs for a resume
         
         Args:
             resume: Resume object
             top_k: Number of jobs to return
+            filters: Optional job filters, e.g. {'location': 'Bangalore',
+                'is_remote': True, 'posted_at': (week_ago, None)} (see VectorStore.filter_mask)
             
         Returns:
             List of match results with scores
         """
+        return self.match_resumes_to_jobs_batch([resume], top_k, filters)[0]
+    
+    def match_resumes_to_jobs_batch(self, resumes: List, top_k: int = 10, filters: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Find top K matching jobs for many resumes at once
+        (e.g. nightly "new jobs for saved resumes" runs)
+        
+        Resumes are encoded in one batch and searched in one FAISS call.
+        
+        Args:
+            resumes: List of Resume objects
+            top_k: Number of jobs to return per resume
+            filters: Optional job filters (see match_resume_to_jobs)
+            
+        Returns:
+            One list of match results per resume (same format as match_resume_to_jobs)
+        """
         if self.job_store is None:
             raise ValueError("Job index not built. Call build_job_index() first.")
+        if not resumes:
+            return []
         
-        # Generate resume embedding
-        resume_embedding = self.embedding_model.encode_resume(resume)
+        # Generate resume embeddings
+        resume_embeddings = self.embedding_model.encode_batch(
+            [self.embedding_model.resume_to_text(resume) for resume in resumes]
+        )
         
         # Semantic search
-        candidates = self.job_store.search(resume_embedding, k=top_k)
+        candidate_lists = self.job_store.search_batch(resume_embeddings, k=top_k, filters=filters)
         
         # Calculate detailed scores
-        results = []
-        for job_id, semantic_score in candidates:
-            job = self.job_store.get_metadata(job_id)['job']
-            
-            # Skill overlap
-            skill_metrics = self.calculate_skill_overlap(
-                resume.technical_skills,
-                job.technical_skills
-            )
+        all_results = []
+        for resume, candidates in zip(resumes, candidate_lists):
+            results = []
+            for job_id, semantic_score in candidates:
+                job = self.job_store.get_metadata(job_id)['job']
+                results.append({
+                    'job_id': job_id,
+                    'job': job,
+                    **self._score_candidate(resume, job, semantic_score)
+                })
             
-            # Combined score (weighted average)
-            combined_score = (
-                0.6 * semantic_score +  # 60% semantic similarity
-                0.4 * skill_metrics['skill_match_score']  # 40% skill match
-            )
-            
-            results.append({
-                'job_id': job_id,
-                'job': job,
-                'semantic_score': semantic_score,
-                'skill_match_score': skill_metrics['skill_match_score'],
-                'combined_score': combined_score,
-                'matched_skills': skill_metrics['matched_skills'],
-                'missing_skills': skill_metrics['missing_skills'],
-                'num_matched': skill_metrics['num_matched'],
-                'num_required': skill_metrics['num_required']
-            })
-        
-        # Sort by combined score
-        results.sort(key=lambda x: x['combined_score'], reverse=True)
-        
-        return results
+            # Sort by combined score
+            results.sort(key=lambda x: x['combined_score'], reverse=True)
+            all_results.append(results)
+        
+        return all_results
     
     def match_job_to_resumes(self, job, top_k: int = 10) -> List[Dict]:
         """
@@ -166,48 +265,49 @@ class ResumeJobMatcher:
         Returns:
             List of match results with scores
         """
+        return self.match_jobs_to_resumes_batch([job], top_k)[0]
+    
+    def match_jobs_to_resumes_batch(self, jobs: List, top_k: int = 10) -> List[List[Dict]]:
+        """
+        Find top K matching resumes for many jobs at once (employer-side screening)
+        
+        Args:
+            jobs: List of JobDescription objects
+            top_k: Number of resumes to return per job
+            
+        Returns:
+            One list of match results per job (same format as match_job_to_resumes)
+        """
         if self.resume_store is None:
             raise ValueError("Resume index not built. Call build_resume_index() first.")
+        if not jobs:
+            return []
         
-        # Generate job embedding
-        job_embedding = self.embedding_model.encode_job(job)
+        # Generate job embeddings
+        job_embeddings = self.embedding_model.encode_batch(
+            [self.embedding_model.job_to_text(job) for job in jobs]
+        )
         
         # Semantic search
-        candidates = self.resume_store.search(job_embedding, k=top_k)
+        candidate_lists = self.resume_store.search_batch(job_embeddings, k=top_k)
         
         # Calculate detailed scores
-        results = []
-        for resume_id, semantic_score in candidates:
-            resume = self.resume_store.get_metadata(resume_id)['resume']
+        all_results = []
+        for job, candidates in zip(jobs, candidate_lists):
+            results = []
+            for resume_id, semantic_score in candidates:
+                resume = self.resume_store.get_metadata(resume_id)['resume']
+                results.append({
+                    'resume_id': resume_id,
+                    'resume': resume,
+                    **self._score_candidate(resume, job, semantic_score)
+                })
             
-            # Skill overlap
-            skill_metrics = self.calculate_skill_overlap(
-                resume.technical_skills,
-                job.technical_skills
-            )
-            
-            # Combined score
-            combined_score = (
-                0.6 * semantic_score +
-                0.4 * skill_metrics['skill_match_score']
-            )
-            
-            results.append({
-                'resume_id': resume_id,
-                'resume': resume,
-                'semantic_score': semantic_score,
-                'skill_match_score': skill_metrics['skill_match_score'],
-                'combined_score': combined_score,
-                'matched_skills': skill_metrics['matched_skills'],
-                'missing_skills': skill_metrics['missing_skills'],
-                'num_matched': skill_metrics['num_matched'],
-                'num_required': skill_metrics['num_required']
-            })
-        
-        # Sort by combined score
-        results.sort(key=lambda x: x['combined_score'], reverse=True)
-        
-        return results
+            # Sort by combined score
+            results.sort(key=lambda x: x['combined_score'], reverse=True)
+            all_results.append(results)
+        
+        return all_results
     
     def explain_match(self, result: Dict) -> str:
         """Generate human-readable explanation of match"""
@@ -0,0 +1,137 @@
+# embeddings/micro_batcher.py
+import os
+import queue
+import asyncio
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import Callable, List
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-text encode calls into batched model calls
+    Callers (request threads or coroutines) submit one text each; a worker
+    thread takes whatever is queued - waiting at most max_wait_ms for more,
+    up to max_batch_size - runs one encode call and hands every caller its
+    own row back.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = None, max_wait_ms: float = None,
+                 timeout_s: float = None):
+        """
+        Initialize batcher
+
+        Args:
+            encode_fn: Batch encoder (list of texts -> 2D array, one row per text)
+            max_batch_size: Max texts per model call (default: EMBEDDING_BATCH_SIZE or 32)
+            max_wait_ms: How long to hold a batch open for more requests
+                (default: EMBEDDING_BATCH_WAIT_MS or 2)
+            timeout_s: How long encode() waits for its result
+                (default: EMBEDDING_BATCH_TIMEOUT_S or 30)
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "2"))) / 1000
+        self.timeout = timeout_s if timeout_s is not None else float(os.getenv("EMBEDDING_BATCH_TIMEOUT_S", "30"))
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the Future resolves to its embedding vector"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Blocking single-text encode (batched with concurrent callers)
+
+        Raises:
+            concurrent.futures.TimeoutError: no result within timeout_s
+        """
+        future = self.submit(text)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # concurrent.futures.TimeoutError (the builtin only from Python 3.11)
+            future.cancel()
+            raise
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        """Awaitable single-text encode for use directly in coroutines"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stats(self) -> dict:
+        """Batch counters"""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0
+        }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _next_batch(self) -> list:
+        """Block for the first request, then gather more until full or max_wait passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                # Take everything already queued without waiting
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            # Drop requests whose caller already gave up (client disconnect,
+            # encode() timeout); the rest can no longer be cancelled
+            batch = [
+                (text, future) for text, future in self._next_batch()
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    self._resolve(future.set_exception, e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                self._resolve(future.set_result, vector)
+
+    @staticmethod
+    def _resolve(setter, value):
+        """Resolve one future without letting a bad one stop the worker"""
+        try:
+            setter(value)
+        except InvalidStateError:
+            pass
@@ -1,162 +1,800 @@
 # embeddings/vector_store.py
 import faiss
 import numpy as np
-import pickle
+import importlib
+import json
+import time
 import os
-from typing import List, Tuple, Optional
+from datetime import date, datetime
+from pydantic import BaseModel
+from typing import Any, Dict, List, Tuple, Optional
+
+STORE_FORMAT_VERSION = 1
+
+# Index types:
+# - 'flat': exact brute-force scan (best below ~20k vectors)
+# - 'hnsw': graph index, high recall, no training (up to ~500k vectors)
+# - 'ivf': inverted lists over k-means cells (needs training)
+# - 'ivfpq': IVF + product quantization, ~16x smaller vectors (needs training)
+# - 'auto': chosen from the corpus size when the index is first built
+INDEX_TYPES = ('flat', 'hnsw', 'ivf', 'ivfpq')
+AUTO_FLAT_MAX = 20_000
+AUTO_HNSW_MAX = 500_000
+
+# Filters matching at most this many vectors are scored exactly on the
+# candidate set instead of through the (approximate) index
+FILTER_EXACT_MAX = 4096
+
+def resolve_index_type(index_type: str, num_vectors: int) -> str:
+    """Map 'auto' to a concrete index type for a corpus of num_vectors"""
+    if index_type != 'auto':
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type} (expected 'auto' or one of {INDEX_TYPES})")
+        return index_type
+    if num_vectors < AUTO_FLAT_MAX:
+        return 'flat'
+    if num_vectors < AUTO_HNSW_MAX:
+        return 'hnsw'
+    return 'ivfpq'
+
+def _attribute_value(value):
+    """
+    Normalize a filterable attribute value
+    Strings are case/whitespace-insensitive, dates become POSIX timestamps.
+    """
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return value
+
+# Pydantic models decode_metadata may rebuild, as "module:QualName". Saved
+# files only ever name one of these; anything else comes back as a plain
+# dict, so loading a store never imports a module chosen by the file.
+METADATA_MODELS = {
+    'jd_parser.jd_parser:JobDescription',
+    'jd_parser.jd_parser:JobMetadata',
+    'jd_parser.models:JobDescription',
+    'resume_parser.models:Resume',
+    'resume_parser.models:JobDescription',
+    'models:Resume',
+}
+_metadata_classes = {}  # tag -> resolved model class
+
+def _model_tag(cls) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+def register_metadata_model(cls):
+    """Allow decode_metadata to rebuild instances of another Pydantic model (usable as a decorator)"""
+    if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+        raise TypeError(f"{cls!r} is not a Pydantic model")
+    tag = _model_tag(cls)
+    METADATA_MODELS.add(tag)
+    _metadata_classes[tag] = cls
+    return cls
+
+def _metadata_model(tag: str):
+    """Allowlisted model class for a "module:QualName" tag (None if not allowed or not importable)"""
+    if tag in _metadata_classes:
+        return _metadata_classes[tag]
+    if tag not in METADATA_MODELS:
+        return None
+    module_name, _, qualname = tag.partition(':')
+    try:
+        cls = importlib.import_module(module_name)
+        for name in qualname.split('.'):
+            cls = getattr(cls, name)
+    except (ImportError, AttributeError):
+        return None
+    if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+        return None
+    _metadata_classes[tag] = cls
+    return cls
+
+def encode_metadata(metadata: Optional[dict]) -> bytes:
+    """
+    Serialize one metadata dict to JSON bytes (no pickle)
+    Pydantic models (JobDescription, Resume, ...) are stored as their JSON
+    dump tagged with "module:QualName" so they can be rebuilt on read.
+    """
+    encoded = {}
+    for key, value in (metadata or {}).items():
+        if isinstance(value, BaseModel):
+            value = {
+                '__model__': _model_tag(type(value)),
+                'data': value.model_dump(mode='json')
+            }
+        encoded[key] = value
+    return json.dumps(encoded, ensure_ascii=False, default=str).encode('utf-8')
+
+def decode_metadata(raw: bytes) -> dict:
+    """Inverse of encode_metadata (models outside METADATA_MODELS come back as plain dicts)"""
+    metadata = json.loads(raw)
+    for key, value in metadata.items():
+        if isinstance(value, dict) and '__model__' in value:
+            cls = _metadata_model(value['__model__'])
+            metadata[key] = cls.model_validate(value['data']) if cls is not None else value['data']
+    return metadata
 
 class VectorStore:
     """
     FAISS-based vector store for fast similarity search
     Stores job/resume embeddings and enables quick retrieval
+    
+    Vectors are buffered and the FAISS index is built on first search/save,
+    so 'auto' can pick the index type from the corpus size and IVF indexes
+    can be trained on the data they will hold.
     """
     
-    def __init__(self, embedding_dim: int = 384):
+    def __init__(self, embedding_dim: int = 384, normalize: bool = True, index_type: str = None,
+                 M: int = 32, ef_construction: int = 200, ef_search: int = 64,
+                 nlist: int = None, nprobe: int = 16, pq_m: int = None):
         """
         Initialize vector store
         
         Args:
             embedding_dim: Dimension of embeddings (384 for MiniLM)
+            normalize: L2-normalize vectors on add/search; pass False when
+                they are already normalized (EmbeddingModel output)
+            index_type: 'auto', 'flat', 'hnsw', 'ivf' or 'ivfpq'
+                (default: VECTOR_INDEX_TYPE or 'auto')
+            M: HNSW graph degree
+            ef_construction: HNSW build-time beam width
+            ef_search: HNSW search-time beam width (recall vs latency)
+            nlist: IVF cell count (default: ~4·sqrt(N))
+            nprobe: IVF cells scanned per query (recall vs latency)
+            pq_m: PQ sub-quantizers, must divide embedding_dim (default: dim / 8)
         """
         self.embedding_dim = embedding_dim
+        self.normalize = normalize
+        self.index_type = index_type or os.getenv("VECTOR_INDEX_TYPE", "auto")
+        resolve_index_type(self.index_type, 0)  # validate early
+        
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
         
-        # FAISS index for fast similarity search
-        self.index = faiss.IndexFlatIP(embedding_dim)  # Inner Product = Cosine for normalized vectors
+        # FAISS index for fast similarity search (built lazily, see _ensure_index)
+        # Inner Product = Cosine for normalized vectors
+        self.index = None
+        self.built_type = None
+        self._pending = []  # (vectors, int ids) batches added since the last build
+        
+        # String ID <-> int64 FAISS ID (sequential, never reused)
+        self._id_to_int = {}  # insertion order == self.ids order
+        self._int_to_id = {}
+        self._next_id = 0
+        # live[int_id]: False once removed (HNSW cannot delete, so removed
+        # vectors stay in the graph as tombstones and are filtered at search)
+        self._live = np.zeros(0, dtype=bool)
+        
+        # Filterable attributes, one compact column per field indexed by int ID:
+        # categorical -> int32 codes into _attr_vocab (0 = missing),
+        # numeric (numbers, dates) -> float64 (NaN = missing)
+        self._attrs = {}  # field -> column
+        self._attr_vocab = {}  # field -> {value: code}, None for numeric fields
         
         # Metadata storage
-        self.ids = []  # List of IDs
-        self.metadata = {}  # ID -> metadata dict
+        self.metadata = {}  # ID -> metadata dict (added since load)
+        
+        # Set by load(): mmapped index file and lazily decoded on-disk metadata
+        self._index_path = None
+        self._mmapped = False
+        self._disk_rows = {}  # ID -> row in the on-disk metadata columns
+        self._disk_offsets = None
+        self._disk_blob = None
         
-        print(f"✅ Vector store initialized | Dimension: {embedding_dim}")
+        print(f"✅ Vector store initialized | Dimension: {embedding_dim} | Index: {self.index_type}")
+    
+    @property
+    def ids(self) -> List[str]:
+        """IDs currently in the store (insertion order)"""
+        return list(self._id_to_int)
+    
+    def _create_index(self, index_type: str, num_vectors: int):
+        """Create an empty (untrained) ID-mapped FAISS index of the given type"""
+        d = self.embedding_dim
+        metric = faiss.METRIC_INNER_PRODUCT
+        
+        if index_type == 'flat':
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(d))
+        
+        if index_type == 'hnsw':
+            index = faiss.IndexHNSWFlat(d, self.M, metric)
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return faiss.IndexIDMap2(index)
+        
+        # IVF: ~4·sqrt(N) cells, but keep >= 39 training points per cell
+        nlist = self.nlist or int(4 * np.sqrt(max(num_vectors, 1)))
+        nlist = max(1, min(nlist, num_vectors // 39 or 1))
+        quantizer = faiss.IndexFlatIP(d)
+        if index_type == 'ivf':
+            index = faiss.IndexIVFFlat(quantizer, d, nlist, metric)
+        else:
+            pq_m = self.pq_m or (d // 8 if d % 8 == 0 else d)
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, pq_m, 8, metric)
+        index.nprobe = min(self.nprobe, nlist)
+        # IVF takes IDs natively; the hashtable allows remove/reconstruct by ID
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+    
+    def _base_index(self):
+        """The underlying HNSW/flat/IVF index (unwraps IndexIDMap2)"""
+        if isinstance(self.index, faiss.IndexIDMap2):
+            return faiss.downcast_index(self.index.index)
+        return self.index
     
-    def add(self, embedding: np.ndarray, id: str, metadata: dict = None):
+    def _ensure_index(self):
+        """Build the index on first use, then flush buffered vectors into it"""
+        if self.index is None:
+            if not self._pending:
+                return
+            vectors, int_ids = self._take_pending()
+            self.built_type = resolve_index_type(self.index_type, len(vectors))
+            self.index = self._create_index(self.built_type, len(vectors))
+            if not self.index.is_trained:
+                print(f"🔨 Training {self.built_type} index on {len(vectors)} vectors...")
+                self.index.train(vectors)
+            self.index.add_with_ids(vectors, int_ids)
+        elif self._pending:
+            self._ensure_writable()
+            self.index.add_with_ids(*self._take_pending())
+    
+    def _ensure_writable(self):
+        """Swap a read-only mmapped index for an in-memory copy before mutating it"""
+        if self._mmapped:
+            self.index = faiss.read_index(self._index_path)
+            self._mmapped = False
+    
+    def _take_pending(self) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.ascontiguousarray(np.vstack([v for v, _ in self._pending]), dtype=np.float32)
+        int_ids = np.concatenate([i for _, i in self._pending]).astype(np.int64)
+        self._pending = []
+        return vectors, int_ids
+    
+    def set_search_params(self, ef_search: int = None, nprobe: int = None):
+        """Tune recall vs latency on a built index (HNSW efSearch / IVF nprobe)"""
+        if ef_search is not None:
+            self.ef_search = ef_search
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if self.index is None:
+            return
+        base = self._base_index()
+        if self.built_type == 'hnsw':
+            base.hnsw.efSearch = self.ef_search
+        elif self.built_type in ('ivf', 'ivfpq'):
+            base.nprobe = min(self.nprobe, base.nlist)
+    
+    def add(self, embedding: np.ndarray, id: str, metadata: dict = None, attributes: dict = None):
         """
-        Add single embedding to store
+        Add single embedding to store (replaces an existing entry with the same ID)
         
         Args:
             embedding: Embedding vector
             id: Unique identifier
             metadata: Optional metadata (e.g., file path, parsed object)
+            attributes: Optional filterable fields (see upsert)
         """
-        # Normalize embedding for cosine similarity
-        embedding = embedding / np.linalg.norm(embedding)
-        
-        # Add to FAISS index
-        self.index.add(np.array([embedding], dtype=np.float32))
-        
-        # Store ID and metadata
-        self.ids.append(id)
-        if metadata:
-            self.metadata[id] = metadata
+        self.upsert(
+            np.asarray(embedding)[np.newaxis, :], [id],
+            [metadata] if metadata else None,
+            [attributes] if attributes else None
+        )
     
-    def add_batch(self, embeddings: np.ndarray, ids: List[str], metadata_list: List[dict] = None):
+    def add_batch(self, embeddings: np.ndarray, ids: List[str], metadata_list: List[dict] = None,
+                  attributes_list: List[dict] = None):
         """
-        Add multiple embeddings to store
+        Add multiple embeddings to store (existing IDs are replaced)
         
         Args:
             embeddings: Matrix of embeddings (n × embedding_dim)
             ids: List of unique identifiers
             metadata_list: Optional list of metadata dicts
+            attributes_list: Optional list of filterable-field dicts (see upsert)
+        """
+        self.upsert(embeddings, ids, metadata_list, attributes_list)
+    
+    def upsert(self, embeddings: np.ndarray, ids: List[str], metadata_list: List[dict] = None,
+               attributes_list: List[dict] = None):
+        """
+        Insert new vectors or replace existing ones, without rebuilding
+        
+        Args:
+            embeddings: Matrix of embeddings (n × embedding_dim)
+            ids: List of identifiers
+            metadata_list: Optional list of metadata dicts
+            attributes_list: Optional list of filterable-field dicts, e.g.
+                {'location': 'Bangalore', 'job_type': 'Full-time',
+                 'is_remote': True, 'posted_at': datetime(...)}
+                Strings/bools are categorical; numbers and dates are numeric.
         """
+        if len(ids) == 0:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        # Keep the last vector when an ID repeats within the batch
+        last = {id: i for i, id in enumerate(ids)}
+        if len(last) < len(ids):
+            rows = sorted(last.values())
+            embeddings = embeddings[rows]
+            metadata_list = [metadata_list[i] for i in rows] if metadata_list else None
+            attributes_list = [attributes_list[i] for i in rows] if attributes_list else None
+            ids = [ids[i] for i in rows]
+        
+        # Replaced vectors get fresh int IDs (HNSW tombstones keep the old ones)
+        existing = [id for id in ids if id in self._id_to_int]
+        if existing:
+            self.remove(existing)
+        
         # Normalize embeddings
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        embeddings = embeddings / norms
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / norms
         
-        # Add to FAISS index
-        self.index.add(embeddings.astype(np.float32))
+        int_ids = np.arange(self._next_id, self._next_id + len(ids), dtype=np.int64)
+        self._next_id += len(ids)
+        self._live = np.concatenate([self._live, np.ones(len(ids), dtype=bool)])
+        for id, int_id in zip(ids, int_ids):
+            self._id_to_int[id] = int(int_id)
+            self._int_to_id[int(int_id)] = id
         
-        # Store IDs and metadata
-        self.ids.extend(ids)
+        # Buffer for the FAISS index
+        self._pending.append((embeddings, int_ids))
+        
+        # Store metadata
         if metadata_list:
             for id, meta in zip(ids, metadata_list):
-                self.metadata[id] = meta
+                if meta:
+                    self.metadata[id] = meta
+        
+        # Grow attribute columns to cover the new int IDs, then fill them
+        for field in self._attrs:
+            self._grow_attribute(field)
+        if attributes_list:
+            self._set_attributes(int_ids, attributes_list)
+    
+    def _grow_attribute(self, field: str):
+        column = self._attrs[field]
+        missing = self._next_id - len(column)
+        if missing > 0:
+            fill = np.zeros(missing, dtype=np.int32) if self._attr_vocab[field] is not None \
+                else np.full(missing, np.nan)
+            self._attrs[field] = np.concatenate([column, fill])
+    
+    def _set_attributes(self, int_ids: np.ndarray, attributes_list: List[dict]):
+        """Write attribute values for freshly allocated int IDs"""
+        for int_id, attributes in zip(int_ids, attributes_list):
+            for field, value in (attributes or {}).items():
+                value = _attribute_value(value)
+                if value is None:
+                    continue
+                if field not in self._attrs:
+                    # First value decides the column kind
+                    numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+                    self._attr_vocab[field] = None if numeric else {}
+                    self._attrs[field] = np.zeros(0, dtype=np.float64 if numeric else np.int32)
+                    self._grow_attribute(field)
+                vocab = self._attr_vocab[field]
+                if vocab is None:
+                    self._attrs[field][int_id] = float(value)
+                else:
+                    self._attrs[field][int_id] = vocab.setdefault(value, len(vocab) + 1)
+    
+    def filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Bitmap (bool per int ID) of live vectors matching every filter
+        
+        Args:
+            filters: field -> predicate, where the predicate is
+                - a value: equality (strings are case-insensitive)
+                - a list/set of values: any of them
+                - a (min, max) tuple on a numeric/date field: inclusive range,
+                  either bound may be None
+                
+        Returns:
+            Boolean mask over int IDs
+        """
+        mask = self._live.copy()
+        for field, predicate in filters.items():
+            column = self._attrs.get(field)
+            if column is None:
+                # Nothing carries this attribute
+                return np.zeros_like(mask)
+            vocab = self._attr_vocab[field]
+            
+            if vocab is None:
+                if isinstance(predicate, tuple):
+                    low, high = (_attribute_value(bound) for bound in predicate)
+                    if low is not None:
+                        mask &= column >= low
+                    if high is not None:
+                        mask &= column <= high
+                elif isinstance(predicate, (list, set)):
+                    mask &= np.isin(column, [_attribute_value(v) for v in predicate])
+                else:
+                    mask &= column == _attribute_value(predicate)
+            else:
+                values = predicate if isinstance(predicate, (list, set, tuple)) else [predicate]
+                codes = [vocab[v] for v in (_attribute_value(v) for v in values) if v in vocab]
+                if not codes:
+                    return np.zeros_like(mask)
+                mask &= column == codes[0] if len(codes) == 1 else np.isin(column, codes)
+        return mask
+    
+    def remove(self, ids: List[str]) -> int:
+        """
+        Remove vectors (and their metadata) by ID
+        
+        Args:
+            ids: Identifiers to remove (unknown IDs are ignored)
+            
+        Returns:
+            Number of vectors removed
+        """
+        int_ids = np.array([self._id_to_int[id] for id in ids if id in self._id_to_int], dtype=np.int64)
+        if len(int_ids) == 0:
+            return 0
+        
+        self._ensure_index()
+        if self.built_type == 'hnsw':
+            self._live[int_ids] = False
+        else:
+            self._ensure_writable()
+            self.index.remove_ids(faiss.IDSelectorArray(int_ids))
+            self._live[int_ids] = False
+        
+        for int_id in int_ids:
+            id = self._int_to_id.pop(int(int_id))
+            del self._id_to_int[id]
+            self.metadata.pop(id, None)
+            self._disk_rows.pop(id, None)
+        
+        # Rebuild the graph once tombstones make up a large share of it
+        if self.built_type == 'hnsw' and self.index.ntotal > 0:
+            if len(self._id_to_int) < 0.8 * self.index.ntotal:
+                self.compact()
+        
+        return len(int_ids)
     
-    def search(self, query_embedding: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+    def compact(self):
+        """Rebuild the HNSW graph without tombstoned vectors"""
+        if self.built_type != 'hnsw':
+            return
+        live_ids = np.array(list(self._id_to_int.values()), dtype=np.int64)
+        vectors = self.index.reconstruct_batch(live_ids) if len(live_ids) else None
+        self.index = self._create_index('hnsw', len(live_ids))
+        self._mmapped = False
+        if vectors is not None:
+            self.index.add_with_ids(vectors, live_ids)
+        print(f"♻️ Compacted HNSW index | {len(live_ids)} live vectors")
+    
+    def _search_params(self, mask: np.ndarray = None):
+        """
+        FAISS search parameters restricting results to a bitmap of int IDs
+        Without a mask, only HNSW tombstones need filtering (None when nothing
+        is deleted).
+        """
+        if mask is None:
+            if self.built_type != 'hnsw' or len(self._id_to_int) == self.index.ntotal:
+                return None, None
+            mask = self._live
+        bitmap = np.packbits(mask, bitorder='little')
+        # n is the bitmap size in bytes; ids past it are treated as filtered out
+        selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        if self.built_type == 'hnsw':
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        elif self.built_type in ('ivf', 'ivfpq'):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self._base_index().nprobe)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        # bitmap/selector must stay alive for the duration of the search
+        return params, (bitmap, selector)
+    
+    def _search_candidates(self, queries: np.ndarray, k: int, candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-k over a small candidate set of int IDs"""
+        scores = queries @ self.index.reconstruct_batch(candidates).T
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(top_scores, order, axis=1), candidates[np.take_along_axis(top, order, axis=1)]
+    
+    def search(self, query_embedding: np.ndarray, k: int = 10, filters: Dict[str, Any] = None) -> List[Tuple[str, float]]:
         """
         Search for k most similar embeddings
         
         Args:
             query_embedding: Query vector
             k: Number of results to return
+            filters: Optional attribute filters (see filter_mask)
             
         Returns:
             List of (id, similarity_score) tuples
         """
-        # Normalize query
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        return self.search_batch(np.asarray(query_embedding)[np.newaxis, :], k, filters)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 10,
+                     filters: Dict[str, Any] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Search many queries in one FAISS call (FAISS parallelizes over queries)
+        
+        Filters become a bitmap IDSelector inside the FAISS search, so the
+        top-k is taken among matching vectors only. Very selective filters
+        (<= FILTER_EXACT_MAX matches) are scored exactly on the candidates.
+        
+        Args:
+            query_embeddings: Query matrix (m × embedding_dim)
+            k: Number of results per query
+            filters: Optional attribute filters (see filter_mask)
+            
+        Returns:
+            One list of (id, similarity_score) tuples per query
+        """
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.embedding_dim:
+            raise ValueError(f"Expected an (m × {self.embedding_dim}) query matrix, got {queries.shape}")
+        
+        # Normalize queries
+        if self.normalize:
+            queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        
+        self._ensure_index()
+        if self.index is None or len(queries) == 0:
+            return [[] for _ in range(len(queries))]
         
         # Search
-        scores, indices = self.index.search(
-            np.array([query_embedding], dtype=np.float32), 
-            k
-        )
+        if filters:
+            mask = self.filter_mask(filters)
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return [[] for _ in range(len(queries))]
+            if len(candidates) <= FILTER_EXACT_MAX:
+                scores, indices = self._search_candidates(queries, k, candidates)
+            else:
+                params, _keepalive = self._search_params(mask)
+                scores, indices = self.index.search(queries, k, params=params)
+        else:
+            params, _keepalive = self._search_params()
+            scores, indices = self.index.search(queries, k, params=params)
         
-        # Return results
+        # Return results (ANN indexes pad missing results with -1)
         results = []
-        for idx, score in zip(indices[0], scores[0]):
-            if idx < len(self.ids):  # Valid index
-                results.append((self.ids[idx], float(score)))
+        for row_indices, row_scores in zip(indices, scores):
+            row = []
+            for idx, score in zip(row_indices.tolist(), row_scores.tolist()):
+                id = self._int_to_id.get(idx)
+                if id is not None:  # Valid index
+                    row.append((id, score))
+            results.append(row)
         
         return results
     
+    def recall_at_k(self, queries: np.ndarray, k: int = 10, corpus: np.ndarray = None) -> dict:
+        """
+        Measure this index against exact (flat) search
+        
+        Args:
+            queries: Query vectors (n × embedding_dim)
+            k: Neighbours per query
+            corpus: Vectors the store was built from; optional except for
+                'ivfpq', whose stored vectors are lossy
+            
+        Returns:
+            Dict with recall@k and mean per-query latency of both searches
+        """
+        self._ensure_index()
+        if self.index is None:
+            raise ValueError("Vector store is empty")
+        
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self.normalize:
+            queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        
+        # Live vectors in self.ids order
+        live_ids = np.array(list(self._id_to_int.values()), dtype=np.int64)
+        if corpus is None:
+            if self.built_type == 'ivfpq':
+                raise ValueError("ivfpq stores compressed vectors; pass the original corpus")
+            corpus = self.index.reconstruct_batch(live_ids)
+        corpus = np.ascontiguousarray(corpus, dtype=np.float32)
+        if self.normalize:
+            corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        
+        exact = faiss.IndexIDMap(faiss.IndexFlatIP(self.embedding_dim))
+        exact.add_with_ids(corpus, live_ids)
+        
+        start = time.perf_counter()
+        _, truth = exact.search(queries, k)
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        # One query at a time, like the API does
+        params, _keepalive = self._search_params()
+        start = time.perf_counter()
+        approx = np.vstack([self.index.search(queries[i:i + 1], k, params=params)[1] for i in range(len(queries))])
+        approx_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        hits = sum(len(set(a[a >= 0]) & set(t[t >= 0])) for a, t in zip(approx, truth))
+        return {
+            'index_type': self.built_type,
+            'k': k,
+            'recall': hits / (len(queries) * k),
+            'ms_per_query': approx_ms,
+            'flat_ms_per_query': exact_ms
+        }
+    
     def get_metadata(self, id: str) -> Optional[dict]:
-        """Get metadata for an ID"""
-        return self.metadata.get(id)
+        """Get metadata for an ID (decoded from disk on demand after load())"""
+        metadata = self.metadata.get(id)
+        if metadata is None and id in self._disk_rows:
+            row = self._disk_rows[id]
+            start, end = int(self._disk_offsets[row]), int(self._disk_offsets[row + 1])
+            if end > start:
+                metadata = decode_metadata(bytes(self._disk_blob[start:end]))
+        return metadata
     
     def save(self, directory: str, name: str = "vector_store"):
         """
         Save vector store to disk
         
+        Layout (no pickle; every file is replaced atomically, so processes
+        that have the old version mmapped keep a consistent view):
+            {name}.index              FAISS index
+            {name}.json               settings + format version
+            {name}.ids.npy            string IDs (fixed-width unicode)
+            {name}.int_ids.npy        FAISS int64 IDs aligned with ids
+            {name}.live.npy           live mask over int IDs
+            {name}.meta.bin           concatenated JSON metadata documents
+            {name}.meta_offsets.npy   int64 byte offsets into meta.bin (n + 1)
+        
         Args:
             directory: Directory to save to
             name: Base name for files
         """
         os.makedirs(directory, exist_ok=True)
+        self._ensure_index()
+        if self.index is None:
+            self.built_type = 'flat'
+            self.index = self._create_index('flat', 0)
+        
+        base = os.path.join(directory, name)
+        ids = self.ids
+        
+        # Metadata column: one JSON document per ID
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        tmp = f"{base}.meta.bin.tmp"
+        with open(tmp, 'wb') as f:
+            for i, id in enumerate(ids):
+                metadata = self.get_metadata(id)
+                raw = encode_metadata(metadata) if metadata else b""
+                f.write(raw)
+                offsets[i + 1] = offsets[i] + len(raw)
+        os.replace(tmp, f"{base}.meta.bin")
+        
+        def save_array(suffix, array):
+            with open(f"{base}.{suffix}.tmp", 'wb') as f:
+                np.save(f, array)
+            os.replace(f"{base}.{suffix}.tmp", f"{base}.{suffix}")
+        
+        save_array("meta_offsets.npy", offsets)
+        save_array("ids.npy", np.array(ids, dtype=str) if ids else np.zeros(0, dtype='<U1'))
+        save_array("int_ids.npy", np.array(list(self._id_to_int.values()), dtype=np.int64))
+        save_array("live.npy", np.asarray(self._live, dtype=bool))
+        for field, column in self._attrs.items():
+            save_array(f"attr.{field}.npy", column)
         
         # Save FAISS index
-        faiss.write_index(self.index, f"{directory}/{name}.index")
+        faiss.write_index(self.index, f"{base}.index.tmp")
+        os.replace(f"{base}.index.tmp", f"{base}.index")
         
-        # Save metadata
-        with open(f"{directory}/{name}_metadata.pkl", 'wb') as f:
-            pickle.dump({
-                'ids': self.ids,
-                'metadata': self.metadata,
-                'embedding_dim': self.embedding_dim
-            }, f)
+        # Settings last: its presence marks a complete store
+        with open(f"{base}.json.tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': STORE_FORMAT_VERSION,
+                'embedding_dim': self.embedding_dim,
+                'normalize': self.normalize,
+                'index_type': self.index_type,
+                'built_type': self.built_type,
+                'next_id': self._next_id,
+                'count': len(ids),
+                # Categorical vocab in code order (code = position + 1)
+                'attributes': {
+                    field: None if vocab is None else list(vocab)
+                    for field, vocab in self._attr_vocab.items()
+                }
+            }, f, indent=2)
+        os.replace(f"{base}.json.tmp", f"{base}.json")
         
         print(f"✅ Vector store saved to {directory}/{name}")
     
     @classmethod
-    def load(cls, directory: str, name: str = "vector_store"):
+    def load(cls, directory: str, name: str = "vector_store", mmap: bool = True):
         """
         Load vector store from disk
         
+        With mmap=True the FAISS index and the metadata column are memory
+        mapped instead of read, so worker processes share them through the
+        page cache. Metadata is decoded per ID on access. The first write
+        (add/upsert/remove) copies the index into memory.
+        
         Args:
             directory: Directory to load from
             name: Base name for files
+            mmap: Memory-map the index and metadata (default True)
             
         Returns:
             VectorStore instance
         """
-        # Load metadata
-        with open(f"{directory}/{name}_metadata.pkl", 'rb') as f:
-            data = pickle.load(f)
+        base = os.path.join(directory, name)
+        with open(f"{base}.json", 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        if settings.get('format_version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store format: {settings.get('format_version')}")
         
         # Create instance
-        store = cls(embedding_dim=data['embedding_dim'])
+        store = cls(
+            embedding_dim=settings['embedding_dim'],
+            normalize=settings['normalize'],
+            index_type=settings['index_type']
+        )
+        store.built_type = settings['built_type']
+        store._next_id = settings['next_id']
         
         # Load FAISS index
-        store.index = faiss.read_index(f"{directory}/{name}.index")
+        store._index_path = f"{base}.index"
+        if mmap:
+            # IVF lists map via IO_FLAG_MMAP; flat/HNSW vector storage via IO_FLAG_MMAP_IFC
+            # (the two cannot be combined)
+            if store.built_type in ('ivf', 'ivfpq'):
+                flags = faiss.IO_FLAG_MMAP
+            else:
+                flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+            flags |= faiss.IO_FLAG_READ_ONLY
+            store.index = faiss.read_index(store._index_path, flags)
+            store._mmapped = True
+        else:
+            store.index = faiss.read_index(store._index_path)
         
-        # Restore metadata
-        store.ids = data['ids']
-        store.metadata = data['metadata']
+        # Restore ID mapping
+        mmap_mode = 'r' if mmap else None
+        ids = np.load(f"{base}.ids.npy", mmap_mode=mmap_mode).tolist()
+        int_ids = np.load(f"{base}.int_ids.npy", mmap_mode=mmap_mode).tolist()
+        store._id_to_int = dict(zip(ids, int_ids))
+        store._int_to_id = dict(zip(int_ids, ids))
+        store._live = np.array(np.load(f"{base}.live.npy", mmap_mode=mmap_mode), dtype=bool)
         
-        print(f"✅ Vector store loaded from {directory}/{name}")
-        print(f"   Contains {len(store.ids)} vectors")
+        # Attribute columns are small (4-8 bytes per vector) and writable
+        for field, values in settings.get('attributes', {}).items():
+            store._attrs[field] = np.load(f"{base}.attr.{field}.npy")
+            store._attr_vocab[field] = None if values is None else {
+                value: code for code, value in enumerate(values, start=1)
+            }
+        
+        # Metadata stays on disk until requested
+        store._disk_rows = {id: row for row, id in enumerate(ids)}
+        store._disk_offsets = np.load(f"{base}.meta_offsets.npy", mmap_mode=mmap_mode)
+        if store._disk_offsets[-1] == 0:
+            store._disk_blob = b""  # np.memmap cannot map an empty file
+        elif mmap:
+            store._disk_blob = np.memmap(f"{base}.meta.bin", dtype=np.uint8, mode='r')
+        else:
+            with open(f"{base}.meta.bin", 'rb') as f:
+                store._disk_blob = f.read()
+        
+        print(f"✅ Vector store loaded from {directory}/{name}" + (" (mmap)" if mmap else ""))
+        print(f"   Contains {len(store)} vectors")
         
         return store
     
     def __len__(self):
         """Number of vectors in store"""
-        return len(self.ids)
\ No newline at end of file
+        return len(self._id_to_int)
+    
+    def __contains__(self, id: str) -> bool:
+        return id in self._id_to_int
\ No newline at end of file
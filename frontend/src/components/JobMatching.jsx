@@ -28,7 +28,8 @@ const JobMatching = () => {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    resume_data: resumeData
+                    resume_id: resumeData.resume_id,
+                    resume_data: resumeData // Fallback if the server-side session expired
                 }),
             });
 
@@ -67,6 +68,7 @@ const JobMatching = () => {
                     remote_only: false,
                     date_posted: 'week',
                     page: 1,
+                    resume_id: resumeData?.resume_id,
                     resume_data: resumeData // Optional: for immediate matching
                 }),
             });
@@ -27,6 +27,7 @@ const LearningRoadmap = () => {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({
+                        resume_id: resumeData.resume_id,
                         resume_data: resumeData,
                         selected_job: selectedJob
                     }),
@@ -41,6 +42,7 @@ const LearningRoadmap = () => {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({
+                        resume_id: resumeData.resume_id,
                         resume_data: resumeData,
                         job: selectedJob,
                         match_score: selectedJob.matchScore
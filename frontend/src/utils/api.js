@@ -22,6 +22,7 @@ export const api = {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
+                resume_id: resumeData.resume_id,
                 resume_data: resumeData,
                 job_ids: jobIds
             })
@@ -37,6 +38,7 @@ export const api = {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
+                resume_id: resumeData.resume_id,
                 resume_data: resumeData,
                 selected_job: selectedJob
             })
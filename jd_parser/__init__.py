@@ -1 +1 @@
-from .jd_parser import HybridJDParser, JobDescription, JobMetadata
+from .jd_parser import HybridJDParser, JobDescription, JobMetadata, PARSER_VERSION
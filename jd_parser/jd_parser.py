@@ -21,10 +21,15 @@ if current_dir not in sys.path:
 
 from skill_ontology import SkillOntology
 from utils.parsing_cache import ParserCache
+from utils.experience import parse_experience_requirement
 import time
 
 load_dotenv()
 
+# Bump when skill extraction or the metadata prompt changes so that
+# job rows parsed by an older version get re-parsed on load
+PARSER_VERSION = 2
+
 # Simplified model for LLM (no skills)
 class JobMetadata(BaseModel):
     """Metadata that requires LLM understanding"""
@@ -41,6 +46,8 @@ class JobDescription(BaseModel):
     company: Optional[str] = None
     location: Optional[str] = None
     experience_required: str
+    experience_min_years: Optional[float] = None  # Parsed from experience_required
+    experience_max_years: Optional[float] = None
     technical_skills: List[str] = []
     soft_skills: List[str] = []
     job_type: Optional[str] = None
@@ -150,11 +157,16 @@ JSON:"""
         # STEP 3: Combine results
         print("\n🔗 Step 3: Combining results...")
         
+        # Numeric experience range, parsed once here and stored with the job
+        min_years, max_years = parse_experience_requirement(metadata.experience_required)
+        
         result = JobDescription(
             job_title=metadata.job_title,
             company=metadata.company,
             location=metadata.location,
             experience_required=metadata.experience_required,
+            experience_min_years=min_years,
+            experience_max_years=max_years,
             technical_skills=technical_skills,  # From regex!
             soft_skills=[],  # Could also extract with regex if needed
             job_type=metadata.job_type,
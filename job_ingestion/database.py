@@ -1,5 +1,4 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from job_ingestion.config import DATABASE_URL
 
@@ -21,5 +20,49 @@ def get_db():
         db.close()
 
 def init_db():
-    """Initialize database tables"""
+    """
+    Initialize database tables
+    Also brings older jobs.db files up to date: missing columns and indexes
+    are added and the numeric experience range is backfilled. Rows parsed by
+    an older PARSER_VERSION are re-parsed by CoreService.refresh_jobs at API
+    startup, so no re-ingest is needed.
+    """
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _add_missing_indexes()
+    
+    # Imported here: the models module needs Base from this one
+    from job_ingestion.storage.repository import JobRepository
+    db = SessionLocal()
+    try:
+        JobRepository.backfill_experience_ranges(db)
+    finally:
+        db.close()
+
+def _add_missing_columns():
+    """
+    Add columns introduced after a table was first created.
+    create_all() only creates missing tables, so older jobs.db files
+    would otherwise lack new nullable columns.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+
+def _add_missing_indexes():
+    """
+    Create indexes declared after a table was first created
+    (create_all() skips existing tables, and ADD COLUMN adds no index)
+    """
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
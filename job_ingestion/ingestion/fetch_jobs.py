@@ -17,6 +17,30 @@ class JobFetcher:
         self.remotive = RemotiveClient()
         self.rapidapi = RapidAPIClient()
         self.alternative = AlternativeJobClient()
+        self._jd_parser = None
+        
+    def get_jd_parser(self):
+        """Lazily create the JD parser (needs the LLM stack); None if unavailable"""
+        if self._jd_parser is None:
+            try:
+                from jd_parser.jd_parser import HybridJDParser
+                self._jd_parser = HybridJDParser()
+            except Exception as e:
+                logger.warning(f"JD parser unavailable, jobs will be parsed on API load: {e}")
+                self._jd_parser = False
+        return self._jd_parser or None
+    
+    def parse_job(self, job: Job):
+        """Store parsed JobDescription fields on a new row so the API doesn't re-parse it"""
+        parser = self.get_jd_parser()
+        if parser is None:
+            return
+        try:
+            from jd_parser.jd_parser import PARSER_VERSION
+            parsed_job = parser.parse(job.description_text or job.description_html or "")
+            job.set_parsed_fields(parsed_job, PARSER_VERSION)
+        except Exception as e:
+            logger.error(f"Failed to parse job {job.job_id}: {e}")
         
     def clean_html(self, raw_html: str) -> str:
         """Strip HTML tags using regex for minimal dependencies"""
@@ -51,6 +75,7 @@ class JobFetcher:
                 job_type=job_data['job_type'],
                 tags=job_data['tags']
             )
+            self.parse_job(new_job)
             db.add(new_job)
             count += 1
         
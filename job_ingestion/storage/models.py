@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, and_, or_, true
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
 from datetime import datetime
 from job_ingestion.database import Base
@@ -19,9 +20,81 @@ class Job(Base):
     job_type = Column(String, nullable=True)
     tags = Column(String, nullable=True)  # Comma-separated tags
     
+    # Parsed JobDescription fields (filled by HybridJDParser at ingestion)
+    parsed_title = Column(String, nullable=True)
+    experience_required = Column(String, nullable=True)
+    experience_min_years = Column(Float, nullable=True, index=True)  # Parsed range; NULL = not specified
+    experience_max_years = Column(Float, nullable=True, index=True)  # NULL (or 0) = no upper bound
+    technical_skills = Column(Text, nullable=True)  # Comma-separated canonical skills
+    parser_version = Column(Integer, nullable=True)  # PARSER_VERSION used; NULL = never parsed
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @staticmethod
+    def parsed_field_values(parsed_job, parser_version: int) -> dict:
+        """Column values for the parsed JobDescription fields"""
+        return {
+            "parsed_title": parsed_job.job_title,
+            "experience_required": parsed_job.experience_required,
+            "experience_min_years": parsed_job.experience_min_years,
+            "experience_max_years": parsed_job.experience_max_years,
+            "technical_skills": ",".join(parsed_job.technical_skills),
+            "parser_version": parser_version,
+        }
+    
+    def set_parsed_fields(self, parsed_job, parser_version: int):
+        """Store the parsed JobDescription fields on this row"""
+        for key, value in self.parsed_field_values(parsed_job, parser_version).items():
+            setattr(self, key, value)
+    
+    def store_parsed_fields(self, db, parsed_job, parser_version: int) -> bool:
+        """
+        Write the parsed fields without touching updated_at
+        
+        The UPDATE only applies if the row still has the updated_at value it was
+        read with, so a concurrent edit is never overwritten (it keeps its newer
+        updated_at and gets picked up again by the next incremental read).
+        
+        Returns:
+            True if the row was written
+        """
+        values = self.parsed_field_values(parsed_job, parser_version)
+        read_at = self.updated_at
+        unchanged = Job.updated_at.is_(None) if read_at is None else Job.updated_at == read_at
+        written = db.query(Job).filter(Job.id == self.id, unchanged).update(
+            {**values, "updated_at": read_at}, synchronize_session=False
+        )
+        # Mirror the values on this instance without marking it dirty
+        for key, value in values.items():
+            set_committed_value(self, key, value)
+        return bool(written)
+    
+    @classmethod
+    def experience_window(cls, min_years: float = None, max_years: float = None):
+        """
+        SQL filter for jobs whose required experience range overlaps
+        [min_years, max_years] (jobs without a parsed range always pass)
+        
+        Example: db.query(Job).filter(Job.experience_window(2, 4))
+        """
+        conditions = []
+        if max_years is not None:
+            conditions.append(or_(cls.experience_min_years.is_(None), cls.experience_min_years <= max_years))
+        if min_years is not None:
+            conditions.append(or_(
+                cls.experience_max_years.is_(None),
+                cls.experience_max_years == 0,
+                cls.experience_max_years >= min_years
+            ))
+        return and_(true(), *conditions)
+    
+    def parsed_skills(self) -> list:
+        """Technical skills stored at ingestion time"""
+        if not self.technical_skills:
+            return []
+        return self.technical_skills.split(",")
+    
     def to_dict(self):
         return {
             "id": self.id,
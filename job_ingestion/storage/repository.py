@@ -5,6 +5,7 @@ Provides helper methods for querying and managing jobs.
 
 from sqlalchemy.orm import Session
 from .models import Job
+from utils.experience import parse_experience_requirement
 from typing import List, Optional
 from datetime import datetime, timedelta
 
@@ -27,6 +28,38 @@ class JobRepository:
         cutoff = datetime.utcnow() - timedelta(days=days)
         return db.query(Job).filter(Job.created_at >= cutoff).all()
     
+    @staticmethod
+    def get_by_experience(db: Session, min_years: Optional[float] = None,
+                          max_years: Optional[float] = None) -> List[Job]:
+        """Get jobs whose required experience range overlaps [min_years, max_years]"""
+        return db.query(Job).filter(Job.experience_window(min_years, max_years)).all()
+    
+    @staticmethod
+    def backfill_experience_ranges(db: Session) -> int:
+        """
+        Fill experience_min_years / experience_max_years from the stored
+        experience_required text on rows that predate those columns
+        
+        Returns:
+            Number of rows updated
+        """
+        rows = db.query(Job.id, Job.experience_required).filter(
+            Job.experience_min_years.is_(None),
+            Job.experience_max_years.is_(None),
+            Job.experience_required.isnot(None)
+        ).all()
+        
+        updates = []
+        for job_id, experience_required in rows:
+            min_years, max_years = parse_experience_requirement(experience_required)
+            if min_years is not None or max_years is not None:
+                updates.append({'id': job_id, 'experience_min_years': min_years, 'experience_max_years': max_years})
+        
+        if updates:
+            db.bulk_update_mappings(Job, updates)
+            db.commit()
+        return len(updates)
+    
     @staticmethod
     def exists(db: Session, job_id: str) -> bool:
         """Check if job already exists"""
@@ -3,9 +3,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 import math
+import numpy as np
 from collections import defaultdict
+from utils.experience import parse_experience_requirement
 
 class WeightedScorer:
     """
@@ -28,13 +30,51 @@ class WeightedScorer:
     
     
     
-    def calculate_skill_match_score(self, resume_skills: List[str], job_skills: List[str]) -> Dict:
-        """Calculate skill overlap with detailed metrics"""
+    def build_resume_profile(self, resume) -> Dict:
+        """
+        Precompute the resume-side inputs that are reused for every job
+        
+        Returns:
+            Dict with canonical_skills (set), implied_skills (set of hierarchy
+            ancestors of canonical_skills), skill_depth (lowercased skill ->
+            depth, see _resume_skill_depth), roles (list) and role_embeddings
+            (len(roles) × dim matrix of lowercased role-title embeddings)
+        """
+        from skill_ontology import SkillOntology  # Lazy import
+        from embeddings.embedding_model import get_embedding_model
+        model = get_embedding_model()
+        
+        canonical_skills = set(SkillOntology.normalize_skill(s) for s in resume.technical_skills)
+        canonical_skills.discard("")
+        implied_skills = SkillOntology.get_implied_skills(canonical_skills)
+        
+        roles = [exp.role for exp in resume.experience if exp.role]
+        if roles:
+            role_embeddings = np.asarray(model.encode_batch([role.lower() for role in roles]), dtype=np.float32)
+        else:
+            role_embeddings = np.zeros((0, model.embedding_dim), dtype=np.float32)
+        
+        return {
+            'canonical_skills': canonical_skills,
+            'implied_skills': implied_skills,
+            'skill_depth': self._resume_skill_depth(resume),
+            'roles': roles,
+            'role_embeddings': role_embeddings
+        }
+    
+    def calculate_skill_match_score(self, resume_skills: List[str], job_skills: List[str],
+                                    resume_canonical: Optional[set] = None,
+                                    resume_implied: Optional[set] = None) -> Dict:
+        """Calculate skill overlap with detailed metrics (canonical/implied: optional precomputed profile sets)"""
         from skill_ontology import SkillOntology  # Lazy import
         
         # 1. Normalize ALL skills to canonical forms using Ontology FIRST
         # This handles aliases: "react.js" -> "React", "react" -> "React"
-        resume_canonical = set(SkillOntology.normalize_skill(s) for s in resume_skills)
+        if resume_canonical is None:
+            resume_canonical = set(SkillOntology.normalize_skill(s) for s in resume_skills)
+        else:
+            # Precomputed (build_resume_profile); copy since inferred skills are added below
+            resume_canonical = set(resume_canonical)
         job_canonical = set(SkillOntology.normalize_skill(s) for s in job_skills)
         
         # Remove empty strings if any
@@ -42,16 +82,12 @@ class WeightedScorer:
         job_canonical.discard("")
 
         # 1.5 INFER PARENT SKILLS (The "Child Implies Parent" Logic)
-        # If resume has "PyTorch" (Child), it implicitly has "Machine Learning" (Parent)
-        inferred_skills = set()
-        for skill in resume_canonical:
-            # Check every parent in hierarchy
-            for parent, children in SkillOntology.SKILL_HIERARCHY.items():
-                # If the resume skill is a known child of this parent
-                if skill in children:
-                    # And the JOB requires this parent
-                    if parent in job_canonical:
-                        inferred_skills.add(parent)
+        # If resume has "PyTorch" (Child), it implicitly has "Machine Learning" (Parent),
+        # and every ancestor above it (compiled ontology closure)
+        if resume_implied is None:
+            resume_implied = SkillOntology.get_implied_skills(resume_canonical)
+        # Only parents the JOB requires count
+        inferred_skills = resume_implied & job_canonical
         
         # Add inferred skills to resume set so they match
         resume_canonical.update(inferred_skills)
@@ -81,6 +117,26 @@ class WeightedScorer:
             'num_required': len(job_canonical)
         }
     
+    def calculate_skill_match_scores(self, num_matched: np.ndarray, num_required: np.ndarray,
+                                     num_extra: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized skill score from overlap counts (e.g. JobCatalog.skill_overlap)
+        Same formula as calculate_skill_match_score, for many jobs at once.
+        
+        Returns:
+            Dict of float arrays: score, match_percentage
+        """
+        num_matched = np.asarray(num_matched, dtype=np.float64)
+        num_required = np.asarray(num_required, dtype=np.float64)
+        match_percentage = np.divide(
+            num_matched, num_required, out=np.zeros_like(num_matched), where=num_required > 0
+        )
+        bonus = np.minimum(0.1, np.asarray(num_extra, dtype=np.float64) * 0.01)
+        return {
+            'score': np.minimum(1.0, match_percentage + bonus),
+            'match_percentage': match_percentage
+        }
+    
     def calculate_experience_score(self, resume_years: float, job_requirement: str) -> Dict:
         """Calculate experience match score"""
         job_min, job_max = self._parse_experience_requirement(job_requirement)
@@ -112,24 +168,47 @@ class WeightedScorer:
         }
     
     def _parse_experience_requirement(self, req_text: str) -> tuple:
-        """Parse experience requirement text"""
-        import re
-        req_lower = req_text.lower().strip()
-        if any(term in req_lower for term in ['entry', 'fresher', '0 year']):
-            return (0, 2)
-        if '+' in req_lower or 'more' in req_lower:
-            match = re.search(r'(\d+)', req_lower)
-            if match: return (int(match.group(1)), None)
-        match = re.search(r'(\d+)\s*-\s*(\d+)', req_lower)
-        if match: return (int(match.group(1)), int(match.group(2)))
-        match = re.search(r'(\d+)', req_lower)
-        if match:
-            years = int(match.group(1))
-            return (years, years + 2)
-        return (None, None)
-    
-    def calculate_title_similarity(self, resume_roles: List[str], job_title: str) -> Dict:
-        """Calculate job title similarity"""
+        """Parse experience requirement text (see utils.experience.parse_experience_requirement)"""
+        return parse_experience_requirement(req_text)
+    
+    def calculate_experience_scores(self, resume_years: Optional[float], required_min: np.ndarray,
+                                    required_max: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_experience_score for many jobs
+        Same curve: under-qualified loses 0.15/year (floor 0.3), over-qualified
+        0.05/year (floor 0.8); a missing (NaN) or 0 maximum means no upper bound.
+        
+        Args:
+            resume_years: Candidate's total experience (None = unknown)
+            required_min, required_max: Parsed ranges per job, NaN where missing
+                (e.g. JobCatalog.experience_ranges columns)
+            
+        Returns:
+            float array of scores aligned with the jobs
+        """
+        required_min = np.asarray(required_min, dtype=np.float64)
+        required_max = np.asarray(required_max, dtype=np.float64)
+        no_requirement = np.isnan(required_min)
+        
+        if resume_years is None:
+            return np.full(required_min.shape[0], 0.5)
+        
+        gap = required_min - resume_years
+        excess = resume_years - required_max
+        has_max = ~np.isnan(required_max) & (required_max != 0)
+        
+        with np.errstate(invalid='ignore'):
+            under = ~no_requirement & (resume_years < required_min)
+            over = ~no_requirement & ~under & has_max & (resume_years > required_max)
+        
+        scores = np.ones(required_min.shape[0], dtype=np.float64)
+        scores[under] = np.maximum(0.3, 1.0 - (gap[under] * 0.15))
+        scores[over] = np.maximum(0.8, 1.0 - (excess[over] * 0.05))
+        return scores
+    
+    def calculate_title_similarity(self, resume_roles: List[str], job_title: str,
+                                   role_embeddings: Optional[np.ndarray] = None) -> Dict:
+        """Calculate job title similarity (role_embeddings: optional precomputed, aligned with resume_roles)"""
         from embeddings.embedding_model import get_embedding_model
         model = get_embedding_model()
         if not resume_roles:
@@ -139,26 +218,63 @@ class WeightedScorer:
         best_score = 0
         best_role = None
         
-        for role in resume_roles:
-            role_embedding = model.encode_text(role.lower())
+        for i, role in enumerate(resume_roles):
+            if role_embeddings is not None:
+                role_embedding = role_embeddings[i]
+            else:
+                role_embedding = model.encode_text(role.lower())
             sim = model.compute_similarity(job_embedding, role_embedding)
             if sim > best_score:
                 best_score = sim
                 best_role = role
-        return {'score': best_score, 'best_match': best_role}
+        # Clip float rounding (identical titles can give 1.0000001) so the score stays in [0, 1]
+        return {'score': min(best_score, 1.0), 'best_match': best_role}
+    
+    def calculate_title_similarities(self, role_embeddings: np.ndarray, title_embeddings: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_title_similarity for many jobs: one
+        (roles × jobs) product, then the best role per job
+        
+        Args:
+            role_embeddings: build_resume_profile()['role_embeddings'] (roles × dim)
+            title_embeddings: Normalized lowercased job-title embeddings
+                (jobs × dim, e.g. JobCatalog.title_embeddings)
+            
+        Returns:
+            Dict of arrays aligned with the jobs: score, and best_role (index
+            into the resume roles, -1 when no role scores above 0)
+        """
+        num_jobs = title_embeddings.shape[0]
+        if len(role_embeddings) == 0:
+            return {'score': np.full(num_jobs, 0.5), 'best_role': np.full(num_jobs, -1)}
+        
+        sims = np.asarray(role_embeddings, dtype=np.float32) @ np.asarray(title_embeddings, dtype=np.float32).T
+        best_role = sims.argmax(axis=0)  # first role on ties, like the scalar loop
+        best_score = sims[best_role, np.arange(num_jobs)].astype(np.float64)
+        
+        # The scalar loop starts from 0 and keeps no role unless it beats it
+        best_role = np.where(best_score > 0, best_role, -1)
+        return {'score': np.clip(best_score, 0.0, 1.0), 'best_role': best_role}
     
-    def calculate_skill_depth_score(self, resume, job) -> Dict:
-        """Evaluate skill depth"""
+    def _resume_skill_depth(self, resume) -> Dict[str, int]:
+        """Depth per lowercased resume skill: 1 + 2 per job using it + 1 per project using it"""
+        # Lowercase each entry's technologies once, not once per skill
+        experience_techs = [set(t.lower() for t in exp.technologies) for exp in resume.experience]
+        project_techs = [set(t.lower() for t in proj.technologies) for proj in resume.projects]
+        
         skill_depth = defaultdict(int)
-        resume_skills_lower = set(s.lower() for s in resume.technical_skills)
-        for skill in resume_skills_lower:
-            skill_depth[skill] += 1
-            for exp in resume.experience:
-                if skill in [t.lower() for t in exp.technologies]:
-                    skill_depth[skill] += 2
-            for proj in resume.projects:
-                if skill in [t.lower() for t in proj.technologies]:
-                    skill_depth[skill] += 1
+        for skill in set(s.lower() for s in resume.technical_skills):
+            skill_depth[skill] = (
+                1 +
+                2 * sum(skill in techs for techs in experience_techs) +
+                sum(skill in techs for techs in project_techs)
+            )
+        return skill_depth
+    
+    def calculate_skill_depth_score(self, resume, job, skill_depth: Optional[Dict[str, int]] = None) -> Dict:
+        """Evaluate skill depth (skill_depth: optional precomputed _resume_skill_depth)"""
+        if skill_depth is None:
+            skill_depth = self._resume_skill_depth(resume)
         
         job_skills_lower = [s.lower() for s in job.technical_skills]
         if not job_skills_lower: return {'score': 0.5, 'depth_map': {}}
@@ -166,30 +282,226 @@ class WeightedScorer:
         max_possible = len(job_skills_lower) * 4
         return {'score': min(1.0, total_depth / max_possible) if max_possible > 0 else 0}
     
-    def calculate_weighted_score(self, resume, job, semantic_score: float) -> Dict:
-        """Final weighted score combining all factors"""
-        skill_metrics = self.calculate_skill_match_score(resume.technical_skills, job.technical_skills)
+    def calculate_skill_depth_scores(self, total_depth: np.ndarray, num_required: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_skill_depth_score from depth totals
+        (e.g. JobCatalog.skill_depth_totals): 0.5 for jobs without skills
+        """
+        total_depth = np.asarray(total_depth, dtype=np.float64)
+        max_possible = np.asarray(num_required, dtype=np.float64) * 4
+        scores = np.full(total_depth.shape[0], 0.5)
+        has_skills = max_possible > 0
+        scores[has_skills] = np.minimum(1.0, total_depth[has_skills] / max_possible[has_skills])
+        return scores
+    
+    def calculate_weighted_score(self, resume, job, semantic_score: float, profile: Optional[Dict] = None) -> Dict:
+        """
+        Final weighted score combining all factors
+        
+        Args:
+            profile: Optional build_resume_profile(resume) output, reused across jobs
+        """
+        if profile is None:
+            profile = self.build_resume_profile(resume)
+        skill_metrics = self.calculate_skill_match_score(
+            resume.technical_skills, job.technical_skills,
+            profile['canonical_skills'], profile.get('implied_skills')
+        )
+        experience_metrics = self.calculate_experience_score(resume.total_experience_years, job.experience_required)
+        title_metrics = self.calculate_title_similarity(profile['roles'], job.job_title, profile['role_embeddings'])
+        depth_metrics = self.calculate_skill_depth_score(resume, job, profile.get('skill_depth'))
+        
+        return self._build_result(skill_metrics, semantic_score, experience_metrics, title_metrics, depth_metrics)
+    
+    def calculate_weighted_scores(self, resume, job_catalog, job_ids: Optional[List[str]] = None,
+                                  semantic_scores: Optional[np.ndarray] = None,
+                                  resume_embedding: Optional[np.ndarray] = None,
+                                  profile: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """
+        Score one resume against many jobs at once, as a struct of arrays
+        
+        Every component is computed for all jobs with array operations over
+        the catalog's precomputed matrices; no per-job dicts are built.
+        All of them read one CatalogSnapshot, so a concurrent catalog refresh
+        cannot shift rows between components. Use rank_scores to order the
+        rows and build_result for the detailed breakdown of only the rows
+        that are returned.
+        
+        Args:
+            resume: Resume object
+            job_catalog: JobCatalog, or a CatalogSnapshot of it (e.g. from
+                JobCatalog.candidates)
+            job_ids: Optional subset of job IDs (default: every job in job_catalog)
+            semantic_scores: Optional precomputed resume-job similarity, aligned
+                with the snapshot's jobs (only valid together with a snapshot)
+            resume_embedding: Resume embedding (used when semantic_scores is None;
+                default: encoded here)
+            profile: Optional build_resume_profile(resume) output
+            
+        Returns:
+            Dict with job_ids and jobs (the JobDescriptions that were scored)
+            plus one N-length array per component (same keys as the breakdown:
+            skill_match, semantic_similarity, experience, title_similarity,
+            skill_depth), total_score, and best_role (index into
+            profile['roles'] for the title match, -1 = none)
+        """
+        if profile is None:
+            profile = self.build_resume_profile(resume)
+        snapshot = job_catalog.snapshot(job_ids)
+        
+        if semantic_scores is None:
+            if resume_embedding is None:
+                from embeddings.embedding_model import get_embedding_model
+                resume_embedding = get_embedding_model().encode_resume(resume)
+            semantic_scores = snapshot.similarities(resume_embedding)
+        semantic = np.asarray(semantic_scores, dtype=np.float64)
+        if semantic.shape[0] != len(snapshot):
+            raise ValueError(f"{semantic.shape[0]} semantic scores for {len(snapshot)} jobs")
+        
+        overlap = snapshot.skill_overlap(profile['canonical_skills'], profile.get('implied_skills'))
+        skill = self.calculate_skill_match_scores(
+            overlap['num_matched'], overlap['num_required'], overlap['num_extra']
+        )['score']
+        
+        ranges = snapshot.experience_ranges
+        experience = self.calculate_experience_scores(resume.total_experience_years, ranges[:, 0], ranges[:, 1])
+        
+        title = self.calculate_title_similarities(profile['role_embeddings'], snapshot.title_embeddings)
+        
+        skill_depth = profile.get('skill_depth')
+        if skill_depth is None:
+            skill_depth = self._resume_skill_depth(resume)
+        depth_totals = snapshot.skill_depth_totals(skill_depth)
+        depth = self.calculate_skill_depth_scores(depth_totals['total_depth'], depth_totals['num_required'])
+        
+        return {
+            'job_ids': snapshot.keys(),
+            'jobs': list(snapshot.jobs),
+            'skill_match': skill,
+            'semantic_similarity': semantic,
+            'experience': experience,
+            'title_similarity': title['score'],
+            'skill_depth': depth,
+            'total_score': self._combine(skill, semantic, experience, title['score'], depth),
+            'best_role': title['best_role']
+        }
+    
+    def rank_scores(self, scores: Dict[str, np.ndarray], top_k: Optional[int] = None,
+                    min_score: Optional[float] = None, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Row indices of a calculate_weighted_scores result, best first
+        (total_score descending, ties by input order)
+        
+        Args:
+            scores: calculate_weighted_scores output
+            top_k: Keep only the K best rows (None = all)
+            min_score: Drop rows whose total_score is below this (0-1 scale)
+            weights: Optional resolve_weights() output; re-ranks the cached
+                component arrays with one weighted sum
+        """
+        if weights is None:
+            total = scores['total_score']
+        else:
+            total = self._combine(
+                scores['skill_match'], scores['semantic_similarity'], scores['experience'],
+                scores['title_similarity'], scores['skill_depth'], weights
+            )
+        candidates = np.arange(len(total))
+        if min_score is not None:
+            candidates = candidates[total >= min_score]
+        if top_k and len(candidates) > top_k:
+            # Everything tied with the K-th score survives the cut; the stable sort settles ties
+            kth = np.partition(total[candidates], len(candidates) - top_k)[len(candidates) - top_k]
+            candidates = candidates[total[candidates] >= kth]
+        order = candidates[np.argsort(-total[candidates], kind='stable')]
+        return order[:top_k] if top_k else order
+    
+    def build_result(self, resume, job, scores: Dict[str, np.ndarray], index: int,
+                     profile: Optional[Dict] = None, weights: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Full scoring result (same format as calculate_weighted_score) for one
+        row of a calculate_weighted_scores result (weights: optional resolve_weights() output)
+        """
+        if profile is None:
+            profile = self.build_resume_profile(resume)
+        skill_metrics = self.calculate_skill_match_score(
+            resume.technical_skills, job.technical_skills,
+            profile['canonical_skills'], profile.get('implied_skills')
+        )
         experience_metrics = self.calculate_experience_score(resume.total_experience_years, job.experience_required)
-        resume_roles = [exp.role for exp in resume.experience]
-        title_metrics = self.calculate_title_similarity(resume_roles, job.job_title)
-        depth_metrics = self.calculate_skill_depth_score(resume, job)
-        
-        total_score = (
-            self.weights['skill_match'] * skill_metrics['score'] +
-            self.weights['semantic_similarity'] * semantic_score +
-            self.weights['experience'] * experience_metrics['score'] +
-            self.weights['title_similarity'] * title_metrics['score'] +
-            self.weights['skill_depth'] * depth_metrics['score']
+        best_role = int(scores['best_role'][index])
+        title_metrics = {
+            'score': float(scores['title_similarity'][index]),
+            'best_match': profile['roles'][best_role] if best_role >= 0 else None
+        }
+        depth_metrics = {'score': float(scores['skill_depth'][index])}
+        return self._build_result(
+            skill_metrics, float(scores['semantic_similarity'][index]),
+            experience_metrics, title_metrics, depth_metrics, weights
+        )
+    
+    def resolve_weights(self, overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Per-request scoring weights: overrides merged into the defaults, then
+        rescaled to sum to 1.0 (so totals stay on the 0-1 scale)
+        
+        Args:
+            overrides: Optional {component: weight}, e.g. {'experience': 0.4}
+            
+        Returns:
+            Weights dict with every component
+            
+        Raises:
+            ValueError: unknown component, negative weight, or all weights zero
+        """
+        if not overrides:
+            return self.weights
+        unknown = set(overrides) - set(self.weights)
+        if unknown:
+            raise ValueError(f"Unknown scoring weights: {sorted(unknown)} (expected {sorted(self.weights)})")
+        if any(value is not None and value < 0 for value in overrides.values()):
+            raise ValueError("Scoring weights must be non-negative")
+        
+        weights = dict(self.weights)
+        weights.update({key: value for key, value in overrides.items() if value is not None})
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError("At least one scoring weight must be positive")
+        return {key: value / total for key, value in weights.items()}
+    
+    def _combine(self, skill: float, semantic: float, experience: float, title: float, depth: float,
+                 weights: Optional[Dict[str, float]] = None) -> float:
+        """Weighted sum of component scores (works on arrays too)"""
+        weights = weights or self.weights
+        return (
+            weights['skill_match'] * skill +
+            weights['semantic_similarity'] * semantic +
+            weights['experience'] * experience +
+            weights['title_similarity'] * title +
+            weights['skill_depth'] * depth
+        )
+    
+    def _build_result(self, skill_metrics: Dict, semantic_score: float, experience_metrics: Dict,
+                      title_metrics: Dict, depth_metrics: Dict, weights: Optional[Dict[str, float]] = None) -> Dict:
+        """Assemble the scoring result dict from computed components"""
+        weights = weights or self.weights
+        total_score = self._combine(
+            skill_metrics['score'],
+            semantic_score,
+            experience_metrics['score'],
+            title_metrics['score'],
+            depth_metrics['score'],
+            weights
         )
         
         return {
             'total_score': total_score,
             'breakdown': {
-                'skill_match': {'score': skill_metrics['score'], 'weight': self.weights['skill_match'], 'details': skill_metrics},
-                'semantic_similarity': {'score': semantic_score, 'weight': self.weights['semantic_similarity']},
-                'experience': {'score': experience_metrics['score'], 'weight': self.weights['experience'], 'details': experience_metrics},
-                'title_similarity': {'score': title_metrics['score'], 'weight': self.weights['title_similarity'], 'details': title_metrics},
-                'skill_depth': {'score': depth_metrics['score'], 'weight': self.weights['skill_depth']}
+                'skill_match': {'score': skill_metrics['score'], 'weight': weights['skill_match'], 'details': skill_metrics},
+                'semantic_similarity': {'score': semantic_score, 'weight': weights['semantic_similarity']},
+                'experience': {'score': experience_metrics['score'], 'weight': weights['experience'], 'details': experience_metrics},
+                'title_similarity': {'score': title_metrics['score'], 'weight': weights['title_similarity'], 'details': title_metrics},
+                'skill_depth': {'score': depth_metrics['score'], 'weight': weights['skill_depth']}
             }
         }
 
@@ -16,10 +16,10 @@ if current_dir not in sys.path:
 from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 from models import Resume
 from skill_ontology import SkillOntology
 from utils.parsing_cache import ParserCache
+from utils.document_text import load_document_text, extract_upload_text
 from dotenv import load_dotenv
 import json
 import re
@@ -110,22 +110,8 @@ JSON Output:"""
         """
         print(f"📄 Loading resume: {file_path}")
         
-        # Determine file type
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
         try:
-            if file_ext == '.pdf':
-                loader = PyPDFLoader(file_path)
-                pages = loader.load()
-                text = "\n".join([page.page_content for page in pages])
-            
-            elif file_ext in ['.docx', '.doc']:
-                loader = Docx2txtLoader(file_path)
-                docs = loader.load()
-                text = "\n".join([doc.page_content for doc in docs])
-            
-            else:
-                raise ValueError(f"Unsupported file type: {file_ext}")
+            text = load_document_text(file_path)
             
             print(f"✅ Loaded {len(text)} characters")
             return text
@@ -265,19 +251,7 @@ JSON Output:"""
         Returns:
             Resume: Parsed resume object
         """
-        import tempfile
-        import os
-        
-        suffix = os.path.splitext(filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file.write(content)
-            temp_path = temp_file.name
-            
-        try:
-            return self.parse_file(temp_path)
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        return self.parse(extract_upload_text(content, filename))
     
     def parse_and_display(self, file_path: str):
         """Parse resume and display results"""
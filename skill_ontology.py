@@ -1,7 +1,6 @@
 # skill_ontology.py (enhanced version) 
-#FUTURE UPDATE: CAN APPLY PREFIX TREE TO THIS TO IMPROVE EFFICIENCY IN TERMS OF TIME COMPLEXITY
 import re
-from typing import List, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
 
 class SkillOntology:
     """Enhanced with regex-based skill extraction"""
@@ -267,6 +266,8 @@ class SkillOntology:
     def extract_skills_from_text(cls, text: str) -> List[str]:
         """
         Extract skills from text using regex patterns (FAST)
+        Single pass: one combined regex for SKILL_PATTERNS plus a token trie
+        over SKILL_MAPPING keys (phrases of any length), see SkillExtractor.
         
         Args:
             text: Job description or resume text
@@ -274,33 +275,31 @@ class SkillOntology:
         Returns:
             List of normalized skill names
         """
-        text_lower = text.lower()
-        found_skills = set()
-        
-        # Method 1: Regex pattern matching
-        for pattern, canonical_skill in cls.SKILL_PATTERNS.items():
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                found_skills.add(canonical_skill)
-        
-        # Method 2: Word-by-word matching
-        words = re.findall(r'\b\w+\b', text_lower)
-        bigrams = [f"{words[i]} {words[i+1]}" for i in range(len(words)-1)]
-        
-        # Check individual words
-        for word in words:
-            if word in cls.SKILL_MAPPING:
-                found_skills.add(cls.SKILL_MAPPING[word])
-        
-        # Check bigrams (two-word skills like "machine learning")
-        for bigram in bigrams:
-            if bigram in cls.SKILL_MAPPING:
-                found_skills.add(cls.SKILL_MAPPING[bigram])
+        return EXTRACTOR.extract(text)
+    
+    @classmethod
+    def extract_skills_batch(cls, texts: List[str]) -> List[List[str]]:
+        """
+        Extract skills from many documents (e.g. an ingestion batch of JDs)
         
-        return sorted(list(found_skills))
+        Args:
+            texts: Job descriptions or resume texts
+            
+        Returns:
+            One sorted skill list per text
+        """
+        return [EXTRACTOR.extract(text) for text in texts]
     
     @classmethod
     def normalize_skill(cls, skill: str) -> str:
-        """Normalize a skill name handling case variations"""
+        """
+        Normalize a skill name handling case variations
+        
+        Known skills come back in their ontology spelling ("css" -> "CSS",
+        "devops" -> "DevOps"), and a normalized name normalizes to itself.
+        Consumers compare skills case-insensitively, so only the display
+        casing of those names differs from plain Title Case.
+        """
         if not skill:
             return ""
             
@@ -308,9 +307,10 @@ class SkillOntology:
         normalized_key = skill.lower().strip()
         normalized_key = " ".join(normalized_key.split())
         
-        # 2. Check mapping first
-        if normalized_key in cls.SKILL_MAPPING:
-            return cls.SKILL_MAPPING[normalized_key]
+        # 2. Check aliases first (SKILL_MAPPING plus every canonical name, lowercased)
+        canonical = ONTOLOGY.aliases.get(normalized_key)
+        if canonical is not None:
+            return canonical
             
         # 3. Fallback: Title Case (e.g. "machine learning -> Machine Learning")
         # Ensure we don't return all lowercase unless intended
@@ -351,9 +351,200 @@ class SkillOntology:
             skill: Standardized skill name
             
         Returns:
-            Set containing the input skill and all its hierarchy children
+            Set containing the input skill and all its hierarchy descendants
+            (transitively: "Data Science" includes "Machine Learning" and "PyTorch")
         """
-        related = {skill}
-        if skill in cls.SKILL_HIERARCHY:
-            related.update(cls.SKILL_HIERARCHY[skill])
-        return related
\ No newline at end of file
+        return {skill} | ONTOLOGY.descendants(skill)
+    
+    @classmethod
+    def get_implied_skills(cls, skills: Iterable[str]) -> Set[str]:
+        """
+        Parent skills implied by a set of skills ("PyTorch" implies "Deep
+        Learning", "Machine Learning", "Data Science" and "Python")
+        
+        Args:
+            skills: Standardized skill names
+            
+        Returns:
+            Set of all hierarchy ancestors of the given skills
+        """
+        return ONTOLOGY.implied_skills(skills)
+
+
+class CompiledOntology:
+    """
+    SkillOntology compiled once at import for constant-time lookups
+    Every canonical skill gets an integer ID; the hierarchy is closed
+    transitively into descendant and ancestor sets, and aliases are
+    flattened into one lowercase table.
+    """
+    
+    def __init__(self, hierarchy: Dict[str, List[str]], mapping: Dict[str, str]):
+        """
+        Compile ontology tables
+        
+        Args:
+            hierarchy: Parent -> children (SkillOntology.SKILL_HIERARCHY)
+            mapping: Lowercase alias -> canonical name (SkillOntology.SKILL_MAPPING)
+        """
+        names = set(mapping.values()) | set(hierarchy)
+        for children in hierarchy.values():
+            names.update(children)
+        
+        # Integer IDs, stable across runs
+        self.skill_names: List[str] = sorted(names)
+        self.skill_ids: Dict[str, int] = {name: i for i, name in enumerate(self.skill_names)}
+        
+        # Lowercase alias -> canonical name; explicit mappings win over plain names
+        self.aliases: Dict[str, str] = {name.lower(): name for name in self.skill_names}
+        self.aliases.update(mapping)
+        
+        children_ids = [set() for _ in self.skill_names]
+        for parent, children in hierarchy.items():
+            children_ids[self.skill_ids[parent]].update(self.skill_ids[child] for child in children)
+        
+        # Transitive closure (the visited set also guards against cycles)
+        self.descendant_ids: List[FrozenSet[int]] = []
+        for skill_id in range(len(self.skill_names)):
+            seen = set()
+            stack = list(children_ids[skill_id])
+            while stack:
+                child = stack.pop()
+                if child not in seen and child != skill_id:
+                    seen.add(child)
+                    stack.extend(children_ids[child])
+            self.descendant_ids.append(frozenset(seen))
+        
+        ancestor_ids = [set() for _ in self.skill_names]
+        for skill_id, descendants in enumerate(self.descendant_ids):
+            for descendant in descendants:
+                ancestor_ids[descendant].add(skill_id)
+        self.ancestor_ids: List[FrozenSet[int]] = [frozenset(ids) for ids in ancestor_ids]
+        
+        # Name-level views of the same closure
+        self._descendants = {
+            name: frozenset(self.skill_names[i] for i in self.descendant_ids[skill_id])
+            for name, skill_id in self.skill_ids.items()
+        }
+        self._ancestors = {
+            name: frozenset(self.skill_names[i] for i in self.ancestor_ids[skill_id])
+            for name, skill_id in self.skill_ids.items()
+        }
+    
+    def skill_id(self, skill: str) -> Optional[int]:
+        """Integer ID of a canonical skill name (None if not in the ontology)"""
+        return self.skill_ids.get(skill)
+    
+    def descendants(self, skill: str) -> FrozenSet[str]:
+        """All skills below this one in the hierarchy"""
+        return self._descendants.get(skill, frozenset())
+    
+    def ancestors(self, skill: str) -> FrozenSet[str]:
+        """All skills above this one in the hierarchy"""
+        return self._ancestors.get(skill, frozenset())
+    
+    def implied_skills(self, skills: Iterable[str]) -> Set[str]:
+        """Union of the ancestors of every given skill"""
+        implied = set()
+        for skill in skills:
+            implied.update(self._ancestors.get(skill, ()))
+        return implied
+
+
+class SkillExtractor:
+    """
+    Compiled skill matcher used by SkillOntology.extract_skills_from_text
+    All SKILL_PATTERNS become one alternation regex (a named group per
+    pattern), and SKILL_MAPPING keys become a trie over word tokens, so a
+    document is lowercased and tokenized once and scanned once.
+    """
+    
+    _TOKEN = re.compile(r'\b\w+\b')
+    
+    def __init__(self, patterns: Dict[str, str], mapping: Dict[str, str]):
+        """
+        Compile extractor tables
+        
+        Args:
+            patterns: Regex -> canonical name (SkillOntology.SKILL_PATTERNS)
+            mapping: Lowercase alias -> canonical name (SkillOntology.SKILL_MAPPING)
+        """
+        self._group_skills = {}
+        groups = []
+        for i, (pattern, canonical_skill) in enumerate(patterns.items()):
+            self._group_skills[f"p{i}"] = canonical_skill
+            groups.append(f"(?P<p{i}>{pattern})")
+        # Text is lowercased first and every pattern starts at a word boundary
+        # with a literal letter, so a shared \b plus a first-letter lookahead
+        # lets the scan skip almost every position cheaply
+        self._pattern = re.compile(r"\b" + self._first_letters(patterns) + "(?:" + "|".join(groups) + ")")
+        
+        # Only keys made of whole word tokens can match tokenized text
+        # ("node.js" or "c++" never could), so they are left out.
+        # Single words are a plain dict lookup; longer phrases go in a trie
+        # (word -> child node, the None key holds the canonical name)
+        self._words: Dict[str, str] = {}
+        self._trie: Dict = {}
+        for key, canonical_skill in mapping.items():
+            words = self._TOKEN.findall(key)
+            if not words or " ".join(words) != key:
+                continue
+            if len(words) == 1:
+                self._words[key] = canonical_skill
+                continue
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[None] = canonical_skill
+    
+    @staticmethod
+    def _first_letters(patterns: Dict[str, str]) -> str:
+        """Lookahead on the possible first characters of the patterns ('' if unknown)"""
+        letters = set()
+        for pattern in patterns:
+            for alternative in pattern.split("|"):
+                alternative = alternative[2:] if alternative.startswith(r"\b") else alternative
+                first = alternative[:1]
+                if not (first.islower() or first.isdigit()) or alternative[1:2] in ("?", "*", "{"):
+                    return ""
+                letters.add(alternative[0])
+        return "(?=[" + "".join(sorted(letters)) + "])"
+    
+    def extract(self, text: str) -> List[str]:
+        """Sorted canonical skills found in text"""
+        text_lower = text.lower()
+        found_skills = set()
+        
+        # Regex patterns: one scan, the matching group names the pattern
+        for match in self._pattern.finditer(text_lower):
+            found_skills.add(self._group_skills[match.lastgroup])
+        
+        words = self._TOKEN.findall(text_lower)
+        distinct = set(words)
+        
+        # Single-word aliases
+        for word in distinct.intersection(self._words):
+            found_skills.add(self._words[word])
+        
+        # Phrases of any length: walk the trie only from tokens that start one
+        if distinct.isdisjoint(self._trie):
+            return sorted(found_skills)
+        for start, first in enumerate(words):
+            if first not in self._trie:
+                continue
+            node = self._trie
+            position = start
+            while position < len(words):
+                node = node.get(words[position])
+                if node is None:
+                    break
+                if None in node:
+                    found_skills.add(node[None])
+                position += 1
+        
+        return sorted(found_skills)
+
+
+# Built once at import
+ONTOLOGY = CompiledOntology(SkillOntology.SKILL_HIERARCHY, SkillOntology.SKILL_MAPPING)
+EXTRACTOR = SkillExtractor(SkillOntology.SKILL_PATTERNS, SkillOntology.SKILL_MAPPING)
@@ -0,0 +1,29 @@
+# tests/test_embedding_backends.py
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("optimum.onnxruntime")
+
+from embeddings.embedding_model import load_sentence_transformer
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+def test_onnx_int8_export_loads(tmp_path, monkeypatch):
+    """The quantized file the exporter writes is the one load_sentence_transformer reads"""
+    monkeypatch.setenv("EMBEDDING_ONNX_DIR", str(tmp_path))
+    monkeypatch.setenv("EMBEDDING_ONNX_QCONFIG", "avx2")
+
+    model = load_sentence_transformer(MODEL_NAME, backend='onnx-int8')
+    exported = os.path.join(tmp_path, MODEL_NAME, "onnx", "model_qint8_avx2.onnx")
+    assert os.path.exists(exported)
+
+    embeddings = model.encode(["Python, FastAPI, Docker"], convert_to_numpy=True)
+    assert embeddings.shape == (1, model.get_sentence_embedding_dimension())
+    assert np.isfinite(embeddings).all()
+
+    # Second load reuses the exported file instead of exporting again
+    mtime = os.path.getmtime(exported)
+    load_sentence_transformer(MODEL_NAME, backend='onnx-int8')
+    assert os.path.getmtime(exported) == mtime
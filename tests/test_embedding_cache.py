@@ -0,0 +1,28 @@
+# tests/test_embedding_cache.py
+import numpy as np
+
+from embeddings.embedding_cache import EmbeddingCache
+
+def test_uncreatable_cache_dir_falls_back_to_memory(tmp_path, monkeypatch):
+    # A directory "under" a regular file can never be created
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", str(blocker / "sub"))
+    monkeypatch.delenv("EMBEDDING_CACHE_PATH", raising=False)
+
+    cache = EmbeddingCache(namespace="test")
+    assert cache._conn is None
+
+    vector = np.arange(4, dtype=np.float32)
+    cache.put_many(["python"], vector[np.newaxis, :])
+    cached, missing = cache.get_many(["python", "rust"])
+    np.testing.assert_array_equal(cached, vector)
+    assert missing is None
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    path = str(tmp_path / "nested" / "embeddings.sqlite")
+    vector = np.ones(3, dtype=np.float32)
+    EmbeddingCache(namespace="test", cache_file=path).put_many(["docker"], vector[np.newaxis, :])
+
+    cached = EmbeddingCache(namespace="test", cache_file=path).get_many(["docker"])[0]
+    np.testing.assert_array_equal(cached, vector)
@@ -0,0 +1,76 @@
+# tests/test_skill_extraction.py
+import json
+import os
+import random
+import re
+import pytest
+
+from skill_ontology import SkillOntology
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "skill_extraction_corpus.json")
+LONGEST_PHRASE = max(len(key.split()) for key in SkillOntology.SKILL_MAPPING)
+
+def legacy_extract(text: str, max_words: int = 2) -> list:
+    """
+    The per-skill regex loop SkillExtractor replaced (PARSER_VERSION 1),
+    with the word n-gram lookup generalized from bigrams to max_words
+    """
+    text_lower = text.lower()
+    found_skills = set()
+
+    for pattern, canonical_skill in SkillOntology.SKILL_PATTERNS.items():
+        if re.search(pattern, text_lower, re.IGNORECASE):
+            found_skills.add(canonical_skill)
+
+    words = re.findall(r'\b\w+\b', text_lower)
+    for n in range(1, max_words + 1):
+        for i in range(len(words) - n + 1):
+            phrase = " ".join(words[i:i + n])
+            if phrase in SkillOntology.SKILL_MAPPING:
+                found_skills.add(SkillOntology.SKILL_MAPPING[phrase])
+
+    return sorted(found_skills)
+
+def generated_corpus(count: int = 300, seed: int = 7) -> list:
+    """Random mixes of every alias and pattern spelling with filler and punctuation"""
+    rng = random.Random(seed)
+    vocabulary = list(SkillOntology.SKILL_MAPPING) + [
+        "python 3", "machine  learning", "deep learning", "k8s", "postgres", "node.js",
+        "c++", "c#", "google cloud", "amazon web services", "javascript", "trust", "javanese",
+    ]
+    filler = ["experience", "with", "and", "or", "strong", "the", "team", "years", "of", "building"]
+    separators = [" ", ", ", " / ", "; ", " - ", "\n", " (", ") ", " • "]
+    docs = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(5, 40)):
+            token = rng.choice(vocabulary) if rng.random() < 0.6 else rng.choice(filler)
+            if rng.random() < 0.2:
+                token = token.upper() if rng.random() < 0.5 else token.title()
+            parts.append(token + rng.choice(separators))
+        docs.append("".join(parts))
+    return docs
+
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    FIXTURE_CORPUS = json.load(f)
+
+@pytest.mark.parametrize("text", FIXTURE_CORPUS + generated_corpus())
+def test_matches_legacy_extractor(text):
+    assert SkillOntology.extract_skills_from_text(text) == legacy_extract(text, LONGEST_PHRASE)
+
+@pytest.mark.parametrize("text", FIXTURE_CORPUS + generated_corpus())
+def test_only_adds_phrases_longer_than_bigrams(text):
+    # The old loop only looked up single words and bigrams; the trie finds
+    # longer SKILL_MAPPING phrases too, and nothing else may differ
+    longer = {
+        skill for key, skill in SkillOntology.SKILL_MAPPING.items() if len(key.split()) > 2
+    }
+    extracted = set(SkillOntology.extract_skills_from_text(text))
+    legacy = set(legacy_extract(text))
+    assert legacy <= extracted
+    assert extracted - legacy <= longer
+
+def test_batch_matches_single():
+    assert SkillOntology.extract_skills_batch(FIXTURE_CORPUS) == [
+        SkillOntology.extract_skills_from_text(text) for text in FIXTURE_CORPUS
+    ]
@@ -0,0 +1,33 @@
+# tests/test_skill_ontology.py
+import pytest
+
+from skill_ontology import SkillOntology, ONTOLOGY
+
+ALL_SPELLINGS = sorted(set(ONTOLOGY.aliases) | set(ONTOLOGY.skill_names))
+
+@pytest.mark.parametrize("raw, expected", [
+    ("css", "CSS"),
+    ("Css", "CSS"),
+    ("devops", "DevOps"),
+    ("ci/cd", "CI/CD"),
+    ("typescript", "TypeScript"),
+    ("react.js", "React"),
+    ("  machine learning ", "Machine Learning"),
+    ("some new framework", "Some New Framework"),
+])
+def test_normalize_skill_uses_ontology_spelling(raw, expected):
+    assert SkillOntology.normalize_skill(raw) == expected
+
+def test_normalize_skill_is_idempotent():
+    for spelling in ALL_SPELLINGS:
+        normalized = SkillOntology.normalize_skill(spelling)
+        assert SkillOntology.normalize_skill(normalized) == normalized, spelling
+
+def test_normalized_names_resolve_in_hierarchy():
+    # Every known skill normalizes to a node name, so hierarchy lookups never miss on casing
+    for spelling in ALL_SPELLINGS:
+        assert ONTOLOGY.skill_id(SkillOntology.normalize_skill(spelling)) is not None, spelling
+
+def test_implied_skills_are_transitive():
+    implied = SkillOntology.get_implied_skills(["PyTorch"])
+    assert {"Deep Learning", "Machine Learning", "Data Science"} <= implied
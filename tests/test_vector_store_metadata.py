@@ -0,0 +1,26 @@
+# tests/test_vector_store_metadata.py
+import sys
+import pytest
+from pydantic import BaseModel
+
+pytest.importorskip("faiss")
+
+from embeddings.vector_store import encode_metadata, decode_metadata, register_metadata_model
+
+class Outer:
+    @register_metadata_model
+    class Posting(BaseModel):
+        title: str
+        skills: list
+
+def test_registered_model_round_trips():
+    posting = Outer.Posting(title="ML Engineer", skills=["Python"])
+    decoded = decode_metadata(encode_metadata({'job': posting, 'rank': 1}))
+    assert decoded == {'job': posting, 'rank': 1}
+    assert isinstance(decoded['job'], Outer.Posting)
+
+def test_unlisted_model_is_not_imported():
+    sys.modules.pop('json.tool', None)
+    raw = b'{"job": {"__model__": "json.tool:main", "data": {"title": "x"}}}'
+    assert decode_metadata(raw) == {'job': {'title': 'x'}}
+    assert 'json.tool' not in sys.modules
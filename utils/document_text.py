@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+def load_document_text(file_path: str) -> str:
+    """
+    Extract plain text from a PDF or DOCX file
+    Module-level (no parser state) so it can run in a worker process.
+
+    Args:
+        file_path: Path to resume file
+
+    Returns:
+        Text content
+    """
+    from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
+
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    if file_ext == '.pdf':
+        pages = PyPDFLoader(file_path).load()
+        return "\n".join([page.page_content for page in pages])
+
+    if file_ext in ['.docx', '.doc']:
+        docs = Docx2txtLoader(file_path).load()
+        return "\n".join([doc.page_content for doc in docs])
+
+    raise ValueError(f"Unsupported file type: {file_ext}")
+
+def extract_upload_text(content: bytes, filename: str) -> str:
+    """
+    Extract plain text from uploaded PDF/DOCX bytes
+
+    Args:
+        content: File content in bytes
+        filename: Original filename (to determine extension)
+    """
+    suffix = os.path.splitext(filename)[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_file.write(content)
+        temp_path = temp_file.name
+
+    try:
+        return load_document_text(temp_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
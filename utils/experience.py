@@ -0,0 +1,38 @@
+import re
+from typing import Optional, Tuple
+
+_ENTRY_TERMS = ('entry', 'fresher', '0 year')
+_FIRST_NUMBER = re.compile(r'(\d+)')
+_RANGE = re.compile(r'(\d+)\s*-\s*(\d+)')
+
+def parse_experience_requirement(req_text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parse a free-text experience requirement into a (min_years, max_years) range
+    Run once per job at parse/ingestion time; the result is stored on the
+    job (JobDescription / Job row) and in JobCatalog.
+
+    Examples:
+        "3-5 years" -> (3, 5), "2+ years" -> (2, None), "5 years" -> (5, 7),
+        "Entry level" -> (0, 2), "Not specified" -> (None, None)
+
+    Args:
+        req_text: Experience requirement text (e.g. JobDescription.experience_required)
+
+    Returns:
+        (min_years, max_years); either can be None
+    """
+    if not req_text:
+        return (None, None)
+    req_lower = req_text.lower().strip()
+    if any(term in req_lower for term in _ENTRY_TERMS):
+        return (0, 2)
+    if '+' in req_lower or 'more' in req_lower:
+        match = _FIRST_NUMBER.search(req_lower)
+        if match: return (int(match.group(1)), None)
+    match = _RANGE.search(req_lower)
+    if match: return (int(match.group(1)), int(match.group(2)))
+    match = _FIRST_NUMBER.search(req_lower)
+    if match:
+        years = int(match.group(1))
+        return (years, years + 2)
+    return (None, None)